@@ -1,4 +1,5 @@
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -10,13 +11,28 @@ import uvicorn
 load_dotenv(Path(__file__).resolve().parent.parent / ".env")
 
 # Import routes
-from routes import upload, analyze, insights
+from routes import upload, analyze, insights, jobs
+from mcp.openai import openai_mcp
+from services.executor import task_executor
+from services.jobs import job_queue
+from services.single_flight import single_flight
+from services.llm_cache import llm_cache
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    job_queue.start()
+    yield
+    # Stop job workers, then release pooled LLM connections and worker processes
+    await job_queue.stop()
+    await openai_mcp.aclose()
+    task_executor.shutdown()
 
 # Create FastAPI app
 app = FastAPI(
     title="DatRep API",
     description="AI-powered data analysis and insights generation",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -36,13 +52,19 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "DatRep API",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "executor": task_executor.stats(),
+        "dataset_cache": await task_executor.cache_stats(),
+        "jobs": job_queue.stats(),
+        "single_flight": single_flight.stats(),
+        "llm_cache": llm_cache.stats()
     }
 
 # Include API routes
 app.include_router(upload.router, prefix="/api", tags=["upload"])
 app.include_router(analyze.router, prefix="/api", tags=["analyze"])
 app.include_router(insights.router, prefix="/api", tags=["insights"])
+app.include_router(jobs.router, prefix="/api", tags=["jobs"])
 
 # Global exception handler
 @app.exception_handler(Exception)
@@ -1,5 +1,6 @@
 import os
 import uuid
+import hashlib
 import shutil
 import aiofiles
 from pathlib import Path
@@ -7,6 +8,20 @@ from typing import Optional, List
 from fastapi import UploadFile, HTTPException
 from datetime import datetime, timedelta
 import asyncio
+import threading
+
+from mcp.manifest import FileManifest, ManifestCorruptedError
+from services import artifacts, columnar, workbooks
+from services.analysis_store import analysis_store
+from services.dataset_cache import dataset_cache
+from services.executor import task_executor
+from services.single_flight import single_flight
+
+# Upload bytes are streamed to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Blobs are guarded by a fixed set of striped locks, indexed by blob path
+BLOB_LOCK_STRIPES = 64
 
 class FileSystemMCP:
     """Model Context Protocol for file system operations"""
@@ -14,16 +29,53 @@ class FileSystemMCP:
     def __init__(self, upload_dir: str = "./uploads"):
         self.upload_dir = Path(upload_dir)
         self.upload_dir.mkdir(exist_ok=True)
+        # Content-addressed storage: one blob per distinct SHA-256, file_ids are aliases
+        self.blob_dir = self.upload_dir / "blobs"
+        # file_id -> metadata index, so lookups never scan the directory.
+        # Opened on first use, so importing the module creates no files
+        self._manifest: Optional[FileManifest] = None
+        self._manifest_lock = threading.Lock()
+        # Serialises creating and releasing the same blob, so a delete never
+        # removes a blob that a concurrent upload is about to alias
+        self._blob_locks = [threading.Lock() for _ in range(BLOB_LOCK_STRIPES)]
+    
+    def _blob_lock(self, blob_path: str) -> threading.Lock:
+        """The lock guarding a blob's existence and its manifest references"""
+        return self._blob_locks[hash(blob_path) % BLOB_LOCK_STRIPES]
     
-    async def save_uploaded_file(self, file: UploadFile) -> dict:
+    @property
+    def manifest(self) -> FileManifest:
+        """The file_id index, loaded (or rebuilt if unreadable) on first access"""
+        if self._manifest is None:
+            with self._manifest_lock:
+                if self._manifest is None:
+                    self.blob_dir.mkdir(exist_ok=True)
+                    manifest = FileManifest(self.upload_dir / "manifest.db")
+                    try:
+                        manifest.load()
+                    except ManifestCorruptedError as e:
+                        print(f"Warning: Upload manifest unreadable ({e}), rebuilding from {self.upload_dir}")
+                        manifest.rebuild(self._scan_upload_dir())
+                    self._manifest = manifest
+        return self._manifest
+    
+    async def save_uploaded_file(self, file: UploadFile, max_size: Optional[int] = None) -> dict:
         """
-        Save uploaded file and return metadata
+        Stream uploaded file to content-addressed storage and return metadata
+        
+        The body is copied in fixed-size chunks, so memory use per upload is
+        constant. The size limit is enforced while streaming and the SHA-256
+        content hash is computed in the same pass. Bytes are stored once per
+        hash under blobs/; the new file_id is an alias (symlink, or hardlink
+        where symlinks are unavailable) pointing at that blob, so re-uploads
+        reuse the stored blob and everything derived from it.
         
         Args:
             file: FastAPI UploadFile object
+            max_size: Maximum allowed size in bytes (no limit if None)
             
         Returns:
-            dict: File metadata including ID, path, and info
+            dict: File metadata including ID, path, hash and info
         """
         # Validate file type
         allowed_extensions = {'.csv', '.xlsx', '.xls'}
@@ -39,42 +91,209 @@ class FileSystemMCP:
         file_id = str(uuid.uuid4())
         original_name = Path(file.filename).name
         safe_filename = f"{file_id}_{original_name}"
-        file_path = self.upload_dir / safe_filename
+        alias_path = self.upload_dir / safe_filename
+        # Partial uploads stay out of the alias namespace until hashed
+        self.blob_dir.mkdir(exist_ok=True)
+        tmp_path = self.blob_dir / f".{file_id}.part"
         
-        # Save file
+        hasher = hashlib.sha256()
+        file_size = 0
         try:
-            async with aiofiles.open(file_path, 'wb') as f:
-                content = await file.read()
-                await f.write(content)
+            async with aiofiles.open(tmp_path, 'wb') as f:
+                while True:
+                    chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    file_size += len(chunk)
+                    if max_size is not None and file_size > max_size:
+                        raise HTTPException(
+                            status_code=413,
+                            detail=f"File too large. Max allowed is {max_size} bytes",
+                        )
+                    hasher.update(chunk)
+                    await f.write(chunk)
+            
+            content_hash = hasher.hexdigest()
+            blob_path = self.blob_dir / f"{content_hash}{file_extension}"
+            file_info = {
+                "file_id": file_id,
+                "original_filename": file.filename,
+                "stored_filename": safe_filename,
+                "alias_path": os.path.abspath(alias_path),
+                "file_path": os.path.realpath(blob_path),
+                "file_size": file_size,
+                "file_type": file_extension,
+                "content_hash": content_hash,
+                "uploaded_at": datetime.utcnow().isoformat()
+            }
+            # The existence check, alias and manifest reference happen under the
+            # blob's lock, so a concurrent delete cannot drop the blob in between
+            with self._blob_lock(file_info["file_path"]):
+                deduplicated = blob_path.exists()
+                if not deduplicated:
+                    os.replace(tmp_path, blob_path)
+                # An existing blob is left untouched (the temp copy is removed
+                # below), so its mtime and every artifact keyed on it stay valid
+                self._create_alias(alias_path, blob_path)
+                self.manifest.put(file_info)
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to save file: {str(e)}"
             )
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
         
-        return {
-            "file_id": file_id,
-            "original_filename": file.filename,
-            "stored_filename": safe_filename,
-            "file_path": str(file_path),
-            "file_size": len(content),
-            "file_type": file_extension,
-            "uploaded_at": datetime.utcnow().isoformat()
-        }
+        file_info.pop("alias_path")
+        file_info["deduplicated"] = deduplicated
+        return file_info
+    
+    def _create_alias(self, alias_path: Path, blob_path: Path) -> None:
+        """Point a file_id alias at a stored blob"""
+        try:
+            alias_path.symlink_to(os.path.relpath(blob_path, alias_path.parent))
+        except OSError:
+            # e.g. Windows without symlink privilege; hardlinks still share the bytes
+            os.link(blob_path, alias_path)
+    
+    def _content_hash_of(self, path: Path) -> str:
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+    
+    def _scan_upload_dir(self) -> List[dict]:
+        """Recover manifest entries from the aliases on disk"""
+        entries = []
+        for alias_path in self.upload_dir.iterdir():
+            if alias_path.name.startswith(".") or "_" not in alias_path.name:
+                continue
+            if not (alias_path.is_symlink() or alias_path.is_file()) or not alias_path.exists():
+                continue
+            file_id, original_name = alias_path.name.split("_", 1)
+            try:
+                uuid.UUID(file_id)
+            except ValueError:
+                continue
+            
+            file_extension = alias_path.suffix.lower()
+            file_path = Path(os.path.realpath(alias_path))
+            content_hash = None
+            if str(file_path.parent) == os.path.realpath(self.blob_dir):
+                content_hash = file_path.name[:-len(file_path.suffix)]
+            else:
+                # Hardlink alias or upload that predates blob storage
+                content_hash = self._content_hash_of(alias_path)
+                blob_path = self.blob_dir / f"{content_hash}{file_extension}"
+                if blob_path.exists() and os.path.samefile(blob_path, alias_path):
+                    file_path = Path(os.path.realpath(blob_path))
+            
+            stat = alias_path.lstat()
+            entries.append({
+                "file_id": file_id,
+                "original_filename": original_name,
+                "stored_filename": alias_path.name,
+                "alias_path": os.path.abspath(alias_path),
+                "file_path": str(file_path),
+                "file_size": file_path.stat().st_size,
+                "file_type": file_extension,
+                "content_hash": content_hash,
+                "uploaded_at": datetime.utcfromtimestamp(stat.st_mtime).isoformat()
+            })
+        return entries
+    
+    def rebuild_manifest(self) -> int:
+        """Rebuild the file_id index from the upload directory"""
+        return self.manifest.rebuild(self._scan_upload_dir())
     
     async def get_file_path(self, file_id: str) -> Optional[str]:
-        """Get file path by file ID"""
-        for file_path in self.upload_dir.glob(f"{file_id}_*"):
-            return str(file_path)
-        return None
+        """
+        Get file path by file ID
+        
+        An O(1) manifest lookup. Aliases resolve to the blob path, so identical
+        uploads share one path (and therefore one cache entry, sidecar and
+        artifact set).
+        
+        Excel workbooks resolve to the converted dataset of one sheet, so no
+        analysis path reads the workbook itself: "file_id/sheet" selects a
+        sheet by name or index and a bare file_id selects the first sheet.
+        The workbook is converted here if the upload's background conversion
+        hasn't finished yet; a workbook that failed to convert resolves to
+        itself, so callers report the parse error as for any other file.
+        """
+        file_id, _, sheet = file_id.partition("/")
+        entry = self.manifest.get(file_id)
+        if entry is None:
+            return None
+        file_path = entry["file_path"]
+        if not os.path.exists(file_path):
+            # Removed behind our back (e.g. by another worker)
+            self.manifest.remove(file_id)
+            return None
+        if workbooks.is_workbook(file_path) and columnar.is_available():
+            if workbooks.conversion_error(file_path) is not None:
+                return None if sheet else file_path
+            try:
+                sheets = await self.get_sheets(file_path)
+            except HTTPException:
+                raise
+            except Exception as e:
+                # Unreadable workbook: hand back the file itself, so callers
+                # report the parse error as they would for any other file
+                print(f"Warning: Workbook conversion failed for {file_path}: {e}")
+                return None if sheet else file_path
+            found = workbooks.find_sheet(sheets, sheet or None)
+            return found["path"] if found else None
+        return None if sheet else file_path
+    
+    async def get_sheets(self, file_path: str) -> List[dict]:
+        """Converted sheets of a stored workbook, converting it once if needed"""
+        sheets = workbooks.load_sheets(file_path)
+        if sheets is None:
+            error = workbooks.conversion_error(file_path)
+            if error is not None:
+                raise ValueError(error)
+            sheets = await single_flight.run(
+                "convert_workbook",
+                file_path,
+                lambda disconnected: task_executor.run(workbooks.convert_workbook_task, file_path, is_disconnected=disconnected)
+            )
+        return sheets
     
     async def delete_file(self, file_id: str) -> bool:
-        """Delete file by file ID"""
-        file_path = await self.get_file_path(file_id)
-        if file_path and os.path.exists(file_path):
-            os.remove(file_path)
-            return True
-        return False
+        """Delete file by file ID, dropping the blob once no alias references it"""
+        entry = self.manifest.get(file_id)
+        if entry is None:
+            return False
+        self._remove_entry(entry)
+        return True
+    
+    def _remove_entry(self, entry: dict) -> None:
+        """Remove an alias, its manifest entry and stored analyses, releasing the blob if unreferenced"""
+        alias_path = Path(entry["alias_path"])
+        if alias_path.is_symlink() or alias_path.exists():
+            alias_path.unlink()
+        analysis_store.remove_file(entry["file_id"])
+        
+        file_path = entry["file_path"]
+        with self._blob_lock(file_path):
+            self.manifest.remove(entry["file_id"])
+            if self.manifest.count_references(file_path) == 0:
+                if file_path != entry["alias_path"] and os.path.exists(file_path):
+                    os.remove(file_path)
+                self._remove_derived(file_path)
+    
+    def _remove_derived(self, file_path: str) -> None:
+        """Drop the sidecar, artifacts and cached frame derived from a stored file"""
+        columnar.remove_sidecar(file_path)
+        artifacts.remove_artifacts(file_path)
+        dataset_cache.invalidate(file_path)
+        for sheet_path in workbooks.remove_sheets(file_path):
+            dataset_cache.invalidate(sheet_path)
     
     async def cleanup_old_files(self, hours: int = 72) -> int:
         """
@@ -89,46 +308,49 @@ class FileSystemMCP:
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
         deleted_count = 0
         
-        for file_path in self.upload_dir.glob("*"):
-            if file_path.is_file():
-                file_time = datetime.fromtimestamp(file_path.stat().st_mtime)
-                if file_time < cutoff_time:
-                    try:
-                        file_path.unlink()
-                        deleted_count += 1
-                    except Exception as e:
-                        print(f"Failed to delete {file_path}: {e}")
+        for entry in self.manifest.all():
+            if datetime.fromisoformat(entry["uploaded_at"]) < cutoff_time:
+                try:
+                    self._remove_entry(entry)
+                    deleted_count += 1
+                except Exception as e:
+                    print(f"Failed to delete {entry['alias_path']}: {e}")
         
         return deleted_count
     
     async def get_file_info(self, file_id: str) -> Optional[dict]:
-        """Get file information by file ID"""
+        """Get file information by file ID (or "file_id/sheet" for a workbook sheet)"""
         file_path = await self.get_file_path(file_id)
-        if not file_path or not os.path.exists(file_path):
+        if not file_path:
             return None
         
+        entry = self.manifest.get(file_id.partition("/")[0])
         stat = os.stat(file_path)
-        return {
+        info = {
             "file_id": file_id,
             "file_path": file_path,
-            "file_size": stat.st_size,
-            "created_at": datetime.fromtimestamp(stat.st_ctime).isoformat(),
+            "file_size": entry["file_size"],
+            "file_type": entry["file_type"],
+            "content_hash": entry["content_hash"],
+            "created_at": entry["uploaded_at"],
             "modified_at": datetime.fromtimestamp(stat.st_mtime).isoformat()
         }
+        if workbooks.is_workbook(entry["file_path"]) and columnar.is_dataset(file_path):
+            info["sheets"] = [sheet["name"] for sheet in await self.get_sheets(entry["file_path"])]
+        return info
     
     async def list_files(self) -> List[dict]:
-        """List all files in upload directory"""
-        files = []
-        for file_path in self.upload_dir.glob("*"):
-            if file_path.is_file():
-                stat = file_path.stat()
-                files.append({
-                    "filename": file_path.name,
-                    "file_size": stat.st_size,
-                    "created_at": datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                    "modified_at": datetime.fromtimestamp(stat.st_mtime).isoformat()
-                })
-        return files
+        """List all uploaded files"""
+        return [
+            {
+                "file_id": entry["file_id"],
+                "filename": entry["stored_filename"],
+                "file_size": entry["file_size"],
+                "created_at": entry["uploaded_at"],
+                "modified_at": entry["uploaded_at"]
+            }
+            for entry in self.manifest.all()
+        ]
 
 # Global file system instance
 file_system = FileSystemMCP(os.getenv("UPLOAD_DIR", "./uploads")) 
\ No newline at end of file
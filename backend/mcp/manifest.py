@@ -0,0 +1,170 @@
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+# Columns persisted for every upload, in table order
+MANIFEST_FIELDS = (
+    "file_id",
+    "original_filename",
+    "stored_filename",
+    "alias_path",
+    "file_path",
+    "file_size",
+    "file_type",
+    "content_hash",
+    "uploaded_at",
+)
+
+
+class ManifestCorruptedError(Exception):
+    """Raised when the manifest database can't be read"""
+
+
+class FileManifest:
+    """Persistent file_id index backed by SQLite and mirrored in memory
+
+    The table is loaded into a dict once at startup so lookups are O(1) and
+    never scan the upload directory. Writes go to SQLite in a transaction
+    first and only then update the dict. Other worker processes may write the
+    same database, so a dict miss falls back to a single indexed query, and a
+    hit whose alias has since been deleted is re-read from SQLite.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _create_schema(self) -> None:
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                file_id TEXT PRIMARY KEY,
+                original_filename TEXT NOT NULL,
+                stored_filename TEXT NOT NULL,
+                alias_path TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                file_size INTEGER NOT NULL,
+                file_type TEXT NOT NULL,
+                content_hash TEXT,
+                uploaded_at TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_files_file_path ON files (file_path)")
+
+    def load(self) -> int:
+        """
+        Load every entry into memory
+
+        Returns:
+            int: Number of entries loaded
+
+        Raises:
+            ManifestCorruptedError: If the database is unreadable
+        """
+        try:
+            with self._lock:
+                self._create_schema()
+                rows = self._conn.execute("SELECT * FROM files").fetchall()
+                self._entries = {row["file_id"]: dict(row) for row in rows}
+                return len(self._entries)
+        except sqlite3.DatabaseError as e:
+            raise ManifestCorruptedError(str(e)) from e
+
+    def rebuild(self, entries: Iterable[dict]) -> int:
+        """
+        Replace the manifest with entries recovered from the upload directory
+
+        A database file that can't be opened is discarded and recreated.
+
+        Returns:
+            int: Number of entries written
+        """
+        with self._lock:
+            try:
+                self._conn.execute("DROP TABLE IF EXISTS files")
+            except sqlite3.DatabaseError:
+                self._conn.close()
+                for suffix in ("", "-wal", "-shm"):
+                    Path(f"{self.db_path}{suffix}").unlink(missing_ok=True)
+                self._conn = self._connect()
+            self._create_schema()
+            recovered = {entry["file_id"]: entry for entry in entries}
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(self._insert_sql(), [self._row(e) for e in recovered.values()])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._entries = recovered
+            return len(recovered)
+
+    def get(self, file_id: str) -> Optional[dict]:
+        """Look up a file_id, falling back to SQLite for uploads made by other workers"""
+        entry = self._entries.get(file_id)
+        if entry is not None:
+            # Another worker may have deleted the upload since it was cached
+            if os.path.lexists(entry["alias_path"]):
+                return entry
+            self._entries.pop(file_id, None)
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM files WHERE file_id = ?", (file_id,)).fetchone()
+            if row is None:
+                return None
+            entry = dict(row)
+            self._entries[file_id] = entry
+            return entry
+
+    def put(self, entry: dict) -> None:
+        """Insert or replace an entry transactionally"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(self._insert_sql(), self._row(entry))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._entries[entry["file_id"]] = {field: entry.get(field) for field in MANIFEST_FIELDS}
+
+    def remove(self, file_id: str) -> None:
+        """Delete an entry transactionally"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM files WHERE file_id = ?", (file_id,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._entries.pop(file_id, None)
+
+    def count_references(self, file_path: str) -> int:
+        """Number of file_ids that resolve to a stored file"""
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM files WHERE file_path = ?", (file_path,)).fetchone()
+            return int(row[0])
+
+    def all(self) -> List[dict]:
+        """Every entry, read from SQLite so other workers' uploads are included"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM files ORDER BY uploaded_at").fetchall()
+            return [dict(row) for row in rows]
+
+    def _insert_sql(self) -> str:
+        placeholders = ", ".join("?" for _ in MANIFEST_FIELDS)
+        return f"INSERT OR REPLACE INTO files ({', '.join(MANIFEST_FIELDS)}) VALUES ({placeholders})"
+
+    def _row(self, entry: dict) -> tuple:
+        return tuple(entry.get(field) for field in MANIFEST_FIELDS)
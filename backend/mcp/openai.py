@@ -1,10 +1,21 @@
 import os
 import json
+import asyncio
+import inspect
+import time
+from contextlib import aclosing
 from datetime import datetime
-from typing import Dict, List, Optional
-from openai import OpenAI
+from typing import AsyncIterator, Awaitable, Dict, List, Optional, Union
+import httpx
+from openai import AsyncOpenAI
 from fastapi import HTTPException
-import pandas as pd
+
+from services import artifacts, context_builder
+from services.executor import task_executor
+from services.llm_cache import llm_cache
+
+SYSTEM_PROMPT = "You are a brilliant, enthusiastic data analyst who loves discovering hidden patterns in data! You make complex insights fun and easy to understand while maintaining professional expertise. Use emojis sparingly but effectively to make responses engaging."
+
 
 class OpenAIMCP:
     """Model Context Protocol for OpenAI/OpenRouter GPT integration"""
@@ -13,19 +24,39 @@ class OpenAIMCP:
         openrouter_key = os.getenv("OPENROUTER_API_KEY")
         openai_key = os.getenv("OPENAI_API_KEY")
         
+        # One pooled async HTTP client per process so LLM calls never block the event loop
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", 20)),
+                max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", 10))
+            ),
+            timeout=httpx.Timeout(
+                float(os.getenv("LLM_READ_TIMEOUT", 60)),
+                connect=float(os.getenv("LLM_CONNECT_TIMEOUT", 10))
+            )
+        )
+        # Caps in-flight LLM requests across all routes in this worker
+        self.semaphore = asyncio.Semaphore(int(os.getenv("LLM_MAX_CONCURRENCY", 4)))
+        
         if openrouter_key:
-            self.client = OpenAI(
+            self.client = AsyncOpenAI(
                 api_key=openrouter_key,
-                base_url="https://openrouter.ai/api/v1"
+                base_url="https://openrouter.ai/api/v1",
+                http_client=self.http_client,
+                max_retries=1
             )
             self.model = os.getenv("OPENROUTER_MODEL", "arcee-ai/trinity-large-preview:free")
         elif openai_key:
-            self.client = OpenAI(api_key=openai_key)
+            self.client = AsyncOpenAI(api_key=openai_key, http_client=self.http_client, max_retries=1)
             self.model = "gpt-5-nano"
         else:
             raise ValueError("OPENROUTER_API_KEY or OPENAI_API_KEY environment variable is required")
     
-    async def generate_insights(self, data_summary: Dict, sample_data: str, file_path: str = None) -> Dict:
+    async def aclose(self) -> None:
+        """Close pooled connections (called on application shutdown)"""
+        await self.http_client.aclose()
+    
+    async def generate_insights(self, data_summary: Dict, sample_data: str, file_path: str = None, use_cache: bool = True) -> Dict:
         """
         Generate insights from dataset using GPT
         
@@ -33,33 +64,43 @@ class OpenAIMCP:
             data_summary: Dictionary containing dataset statistics
             sample_data: Sample of the actual data
             file_path: Path to the actual data file for detailed analysis
+            use_cache: Set False to skip stored insights and cached LLM responses
             
         Returns:
             Dict: Generated insights and analysis
         """
         try:
+            # Insights are stored per content-addressed file, so duplicate
+            # uploads reuse them without another LLM round trip
+            if file_path and use_cache:
+                stored = artifacts.load_artifact(file_path, "insights")
+                if stored is not None:
+                    return stored
+            
             # Load actual data for detailed analysis
             actual_data_context = ""
             if file_path:
                 try:
-                    df = pd.read_csv(file_path) if file_path.endswith('.csv') else pd.read_excel(file_path)
-                    actual_data_context = self._create_detailed_data_context(df, data_summary)
+                    actual_data_context = await task_executor.run(context_builder.insights_context_task, file_path)
                 except Exception as e:
                     print(f"Warning: Could not load actual data: {e}")
             
             # Create prompt for insight generation
             prompt = self._create_insights_prompt(data_summary, sample_data, actual_data_context)
             
-            response = await self._call_gpt(prompt)
+            response = await self._call_gpt(prompt, use_cache=use_cache)
             
             # Parse and structure the response
             insights = self._parse_insights_response(response)
             
-            return {
+            result = {
                 "insights": insights,
                 "summary": data_summary,
                 "generated_at": datetime.utcnow().isoformat() + "Z"
             }
+            if file_path:
+                artifacts.save_artifact(file_path, "insights", result)
+            return result
             
         except Exception as e:
             raise HTTPException(
@@ -67,7 +108,7 @@ class OpenAIMCP:
                 detail=f"Failed to generate insights: {str(e)}"
             )
     
-    async def chat_with_data(self, question: str, data_context: str, file_path: str = None) -> Dict:
+    async def chat_with_data(self, question: str, data_context: str, file_path: str = None, use_cache: bool = True) -> Dict:
         """
         Chat with data using GPT with dataset-specific answers
         
@@ -75,26 +116,20 @@ class OpenAIMCP:
             question: User's question about the data
             data_context: Context about the dataset
             file_path: Path to the actual data file
+            use_cache: Set False to bypass the LLM response cache
             
         Returns:
             Dict: GPT's response to the question
         """
         try:
-            # Load actual data for specific analysis
-            detailed_context = data_context
-            if file_path:
-                try:
-                    df = pd.read_csv(file_path) if file_path.endswith('.csv') else pd.read_excel(file_path)
-                    detailed_context = self._create_chat_data_context(df, question)
-                except Exception as e:
-                    print(f"Warning: Could not load actual data for chat: {e}")
-            
+            detailed_context, context_tokens = await self._chat_context(question, data_context, file_path)
             prompt = self._create_chat_prompt(question, detailed_context)
-            response = await self._call_gpt(prompt)
+            response = await self._call_gpt(prompt, use_cache=use_cache)
             
             return {
                 "question": question,
                 "answer": response,
+                "context_tokens": context_tokens,
                 "timestamp": datetime.utcnow().isoformat() + "Z"
             }
             
@@ -104,154 +139,98 @@ class OpenAIMCP:
                 detail=f"Failed to process chat question: {str(e)}"
             )
     
-    def _create_detailed_data_context(self, df: pd.DataFrame, data_summary: Dict) -> str:
-        """Create detailed context from actual data"""
-        context_parts = []
-        
-        # Add key statistics with specific examples
-        numeric_cols = df.select_dtypes(include=['number']).columns
-        categorical_cols = df.select_dtypes(include=['object', 'category']).columns
-        
-        if len(numeric_cols) > 0:
-            context_parts.append("📊 Numeric Columns Analysis (use these EXACT numbers in insights):")
-            grand_total = df[numeric_cols].sum().sum()
-            for col in numeric_cols[:10]:  # Include more columns for revenue-type data
-                stats = df[col].describe()
-                col_sum = df[col].sum()
-                pct = (col_sum / grand_total * 100) if grand_total > 0 else 0
-                max_val = df[col].max()
-                min_val = df[col].min()
-                context_parts.append(f"- {col}: sum={col_sum:,.2f} ({pct:.1f}% of total), mean={stats['mean']:.2f}, min={min_val:.2f}, max={max_val:.2f}")
+    async def stream_chat_with_data(self, question: str, data_context: Union[str, Awaitable[str]], file_path: str = None, use_cache: bool = True) -> AsyncIterator[Dict]:
+        """
+        Stream a chat answer while the model generates it
         
-        if len(categorical_cols) > 0:
-            context_parts.append("🏷️ Categorical Columns Analysis:")
-            for col in categorical_cols[:5]:  # Limit to first 5 columns
-                value_counts = df[col].value_counts()
-                top_values = value_counts.head(3)
-                context_parts.append(f"- {col}: top values = {dict(top_values)}")
+        Args:
+            question: User's question about the data
+            data_context: Context about the dataset, or an awaitable resolving to it
+                (awaited after "start", so a failure becomes an "error" event)
+            file_path: Path to the actual data file
+            use_cache: Set False to bypass the LLM response cache
+            
+        Yields:
+            Dict: A "start" event, {"event": "token", "data": {"content": ...}} per
+            chunk, then a single "done" event with timing and token usage, or an
+            "error" event
+        """
+        started = time.perf_counter()
+        first_token_at = None
+        usage = None
+        parts = []
+        # Flushed before the context is built so the client sees bytes immediately
+        yield {"event": "start", "data": {"question": question}}
+        try:
+            if inspect.isawaitable(data_context):
+                data_context = await data_context
+            detailed_context, context_tokens = await self._chat_context(question, data_context, file_path)
+            context_ms = (time.perf_counter() - started) * 1000
+            messages = self._chat_messages(self._create_chat_prompt(question, detailed_context))
+            
+            cached = llm_cache.get(self.model, messages) if use_cache else None
+            if cached is not None:
+                first_token_at = time.perf_counter()
+                parts.append(cached)
+                yield {"event": "token", "data": {"content": cached}}
+            else:
+                async with aclosing(self._stream_with_fallback(messages)) as chunks:
+                    async for content, chunk_usage in chunks:
+                        if chunk_usage is not None:
+                            usage = chunk_usage
+                        if content:
+                            if first_token_at is None:
+                                first_token_at = time.perf_counter()
+                            parts.append(content)
+                            yield {"event": "token", "data": {"content": content}}
                 
-                # Find most common and least common
-                most_common = value_counts.index[0] if len(value_counts) > 0 else None
-                least_common = value_counts.index[-1] if len(value_counts) > 0 else None
-                context_parts.append(f"  Most common: {most_common} ({value_counts.iloc[0]} times)")
-                context_parts.append(f"  Least common: {least_common} ({value_counts.iloc[-1]} times)")
-        
-        # Add correlation analysis for numeric columns with specific examples
-        if len(numeric_cols) >= 2:
-            corr_matrix = df[numeric_cols].corr()
-            high_corr = []
-            for i in range(len(corr_matrix.columns)):
-                for j in range(i+1, len(corr_matrix.columns)):
-                    corr_val = corr_matrix.iloc[i, j]
-                    if abs(corr_val) > 0.3:  # Lower threshold to catch more correlations
-                        high_corr.append(f"{corr_matrix.columns[i]} & {corr_matrix.columns[j]}: {corr_val:.3f}")
+                answer = "".join(parts)
+                if answer:
+                    llm_cache.put(self.model, messages, answer)
             
-            if high_corr:
-                context_parts.append("🔗 Strong Correlations:")
-                context_parts.extend(high_corr[:5])  # Limit to top 5 correlations
-        
-        # Add outlier analysis
-        if len(numeric_cols) > 0:
-            context_parts.append("🎯 Outlier Analysis:")
-            for col in numeric_cols[:3]:
-                Q1 = df[col].quantile(0.25)
-                Q3 = df[col].quantile(0.75)
-                IQR = Q3 - Q1
-                outliers = df[(df[col] < Q1 - 1.5*IQR) | (df[col] > Q3 + 1.5*IQR)]
-                if len(outliers) > 0:
-                    context_parts.append(f"- {col}: {len(outliers)} outliers found")
-                    # Show specific outlier values
-                    outlier_values = outliers[col].head(3).tolist()
-                    context_parts.append(f"  Outlier values: {outlier_values}")
-        
-        # Add sample data with more context
-        context_parts.append("📋 Sample Data (first 5 rows with all columns):")
-        context_parts.append(df.head(5).to_string())
-        
-        return "\n".join(context_parts)
+            finished = time.perf_counter()
+            yield {
+                "event": "done",
+                "data": {
+                    "question": question,
+                    "cached": cached is not None,
+                    "timing": {
+                        "context_ms": round(context_ms, 1),
+                        "first_token_ms": round((first_token_at - started) * 1000, 1) if first_token_at else None,
+                        "total_ms": round((finished - started) * 1000, 1)
+                    },
+                    "usage": usage,
+                    "context_tokens": context_tokens,
+                    "timestamp": datetime.utcnow().isoformat() + "Z"
+                }
+            }
+            
+        except Exception as e:
+            yield {"event": "error", "data": {"message": f"Failed to process chat question: {str(e)}"}}
     
-    def _create_chat_data_context(self, df: pd.DataFrame, question: str) -> str:
-        """Create context specific to the user's question"""
-        question_lower = question.lower()
-        context_parts = []
-
-        # ALWAYS add pre-computed column sums first - critical for "total X" questions
-        numeric_cols = df.select_dtypes(include=['number']).columns
-        if len(numeric_cols) > 0:
-            context_parts.append("PRE-COMPUTED COLUMN TOTALS (use these for 'total', 'sum', 'how much' - e.g. 'total sales' = Gross Sales or Net Sales sum):")
-            grand_total = df[numeric_cols].sum().sum()
-            for col in numeric_cols:
-                col_sum = df[col].sum()
-                pct = (col_sum / grand_total * 100) if grand_total > 0 else 0
-                context_parts.append(f'- "{col}": sum={col_sum:,.2f} ({pct:.1f}% of total)')
-            context_parts.append("")
-        
-        # Add relevant data based on question type
-        if any(word in question_lower for word in ['trend', 'pattern', 'correlation']):
-            numeric_cols = df.select_dtypes(include=['number']).columns
-            if len(numeric_cols) >= 2:
-                corr_matrix = df[numeric_cols].corr()
-                context_parts.append("🔗 Correlation Analysis:")
-                for i in range(len(corr_matrix.columns)):
-                    for j in range(i+1, len(corr_matrix.columns)):
-                        corr_val = corr_matrix.iloc[i, j]
-                        context_parts.append(f"- {corr_matrix.columns[i]} vs {corr_matrix.columns[j]}: {corr_val:.3f}")
-        
-        if any(word in question_lower for word in ['outlier', 'anomaly', 'extreme']):
-            numeric_cols = df.select_dtypes(include=['number']).columns
-            context_parts.append("🎯 Outlier Analysis:")
-            for col in numeric_cols[:3]:
-                Q1 = df[col].quantile(0.25)
-                Q3 = df[col].quantile(0.75)
-                IQR = Q3 - Q1
-                outliers = df[(df[col] < Q1 - 1.5*IQR) | (df[col] > Q3 + 1.5*IQR)]
-                if len(outliers) > 0:
-                    context_parts.append(f"- {col}: {len(outliers)} outliers found")
-                    # Show specific outlier values and their context
-                    outlier_values = outliers[col].head(3).tolist()
-                    context_parts.append(f"  Outlier values: {outlier_values}")
-        
-        if any(word in question_lower for word in ['distribution', 'spread', 'range']):
-            numeric_cols = df.select_dtypes(include=['number']).columns
-            context_parts.append("📊 Distribution Analysis:")
-            for col in numeric_cols[:3]:
-                stats = df[col].describe()
-                context_parts.append(f"- {col}: mean={stats['mean']:.2f}, std={stats['std']:.2f}, range={stats['max']-stats['min']:.2f}")
-        
-        if any(word in question_lower for word in ['highest', 'maximum', 'top', 'best']):
-            numeric_cols = df.select_dtypes(include=['number']).columns
-            context_parts.append("🏆 Highest Values:")
-            for col in numeric_cols[:3]:
-                max_val = df[col].max()
-                max_idx = df[col].idxmax()
-                context_parts.append(f"- {col}: {max_val:.2f} (row {max_idx})")
-        
-        if any(word in question_lower for word in ['lowest', 'minimum', 'bottom', 'worst']):
-            numeric_cols = df.select_dtypes(include=['number']).columns
-            context_parts.append("📉 Lowest Values:")
-            for col in numeric_cols[:3]:
-                min_val = df[col].min()
-                min_idx = df[col].idxmin()
-                context_parts.append(f"- {col}: {min_val:.2f} (row {min_idx})")
-        
-        if any(word in question_lower for word in ['average', 'mean', 'median']):
-            numeric_cols = df.select_dtypes(include=['number']).columns
-            context_parts.append("📈 Average Values:")
-            for col in numeric_cols[:3]:
-                mean_val = df[col].mean()
-                median_val = df[col].median()
-                context_parts.append(f"- {col}: mean={mean_val:.2f}, median={median_val:.2f}")
-        
-        # Add full dataset (or up to 2000 rows for context limits)
-        max_rows = 2000
-        df_to_include = df if len(df) <= max_rows else df.head(max_rows)
-        context_parts.append(f"📋 Full Dataset ({len(df_to_include)} rows, total dataset has {len(df)} rows):")
-        context_parts.append(df_to_include.to_string())
+    async def _chat_context(self, question: str, data_context: str, file_path: Optional[str]) -> tuple:
+        """
+        Question-specific context built from the actual file, falling back to data_context
         
-        return "\n".join(context_parts)
+        Returns:
+            tuple: (context text, estimated token usage per section or None)
+        """
+        if file_path:
+            try:
+                built = await task_executor.run(context_builder.chat_context_task, file_path, question)
+                return built["context"], {
+                    "sections": built["sections"],
+                    "total": built["total_tokens"],
+                    "budget": built["token_budget"]
+                }
+            except Exception as e:
+                print(f"Warning: Could not load actual data for chat: {e}")
+        return data_context, None
     
     def _create_insights_prompt(self, data_summary: Dict, sample_data: str, actual_data_context: str = "") -> str:
         """Create prompt for insight generation with actual data context"""
+        # Built outside the f-string: backslashes in f-string expressions need Python 3.12+
+        detailed_section = f"🎯 Detailed Analysis:\n{actual_data_context}" if actual_data_context else ""
         prompt = f"""
 You are a brilliant and enthusiastic data analyst who loves discovering hidden patterns in data! 🎯
 
@@ -268,7 +247,7 @@ Dataset Summary:
 Sample Data:
 {sample_data}
 
-{f"🎯 Detailed Analysis:\n{actual_data_context}" if actual_data_context else ""}
+{detailed_section}
 
 Now, let's dive deep! Provide 6-8 AMAZING insights about THIS specific dataset. Be:
 ✨ SPECIFIC - Use actual numbers, names, and exact values from the data
@@ -336,40 +315,90 @@ Include specific examples like: "The correlation between age and salary is 0.85,
 Keep it under 400 words unless they specifically ask for more detail.
 """
     
-    async def _call_gpt(self, prompt: str) -> str:
+    async def _call_gpt(self, prompt: str, use_cache: bool = True) -> str:
         """Make API call to OpenAI GPT with optimized token usage"""
+        messages = self._chat_messages(prompt)
+        # Identical prompts (same model, same messages) are answered from disk;
+        # the key is the configured model even when the fallback answered
+        if use_cache:
+            cached = llm_cache.get(self.model, messages)
+            if cached is not None:
+                return cached
+        
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a brilliant, enthusiastic data analyst who loves discovering hidden patterns in data! You make complex insights fun and easy to understand while maintaining professional expertise. Use emojis sparingly but effectively to make responses engaging."},
-                    {"role": "user", "content": prompt}
-                ],
+            response = await self._create_completion(self.model, messages)
+            
+        except Exception as e:
+            # Fallback to GPT-3.5-turbo if the configured model fails
+            try:
+                response = await self._create_completion("gpt-3.5-turbo", messages)
+                
+            except Exception as fallback_error:
+                raise Exception(f"Both {self.model} and gpt-3.5-turbo failed: {str(e)}, {str(fallback_error)}")
+        
+        if response:
+            llm_cache.put(self.model, messages, response)
+        return response
+    
+    def _chat_messages(self, prompt: str) -> List[Dict]:
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+    
+    async def _create_completion(self, model: str, messages: List[Dict]) -> str:
+        """Await one completion, holding a slot of the global concurrency semaphore"""
+        async with self.semaphore:
+            response = await self.client.chat.completions.create(
+                model=model,
+                messages=messages,
                 max_tokens=1000,  # Reduced from 2000 for efficiency
                 temperature=0.2,   # Reduced for more consistent, factual responses
                 top_p=0.9
             )
-            
-            return response.choices[0].message.content
-            
+        
+        return response.choices[0].message.content
+    
+    async def _stream_with_fallback(self, messages: List[Dict]) -> AsyncIterator[tuple]:
+        """Stream from the configured model, switching to gpt-3.5-turbo if it fails before any output"""
+        emitted = False
+        try:
+            async with aclosing(self._stream_completion(self.model, messages)) as items:
+                async for item in items:
+                    emitted = True
+                    yield item
         except Exception as e:
-            # Fallback to GPT-3.5-turbo if GPT-4o-mini fails
+            if emitted:
+                raise
             try:
-                response = self.client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are a brilliant, enthusiastic data analyst who loves discovering hidden patterns in data! You make complex insights fun and easy to understand while maintaining professional expertise. Use emojis sparingly but effectively to make responses engaging."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=1000,
-                    temperature=0.2,
-                    top_p=0.9
-                )
-                
-                return response.choices[0].message.content
-                
+                async with aclosing(self._stream_completion("gpt-3.5-turbo", messages)) as items:
+                    async for item in items:
+                        yield item
             except Exception as fallback_error:
-                raise Exception(f"Both GPT-4o-mini and GPT-3.5-turbo failed: {str(e)}, {str(fallback_error)}")
+                raise Exception(f"Both {self.model} and gpt-3.5-turbo failed: {str(e)}, {str(fallback_error)}")
+    
+    async def _stream_completion(self, model: str, messages: List[Dict]) -> AsyncIterator[tuple]:
+        """
+        Yield (content, usage) per streamed chunk
+
+        The semaphore slot is held until the stream ends, and the upstream
+        response is closed even when the consumer stops early.
+        """
+        async with self.semaphore:
+            stream = await self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=1000,
+                temperature=0.2,
+                top_p=0.9,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            async with stream:
+                async for chunk in stream:
+                    content = chunk.choices[0].delta.content if chunk.choices else None
+                    usage = chunk.usage.model_dump() if getattr(chunk, "usage", None) else None
+                    yield content, usage
     
     def _parse_insights_response(self, response: str) -> Dict:
         """Parse GPT response into structured insights"""
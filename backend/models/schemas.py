@@ -10,6 +10,15 @@ class ChartType(str, Enum):
     SCATTER = "scatter"
     HEATMAP = "heatmap"
 
+class CorrelationMethod(str, Enum):
+    PEARSON = "pearson"
+    SPEARMAN = "spearman"
+
+class JobPriority(str, Enum):
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
 class UploadResponse(BaseModel):
     """Response model for file upload"""
     success: bool
@@ -21,6 +30,7 @@ class AnalysisRequest(BaseModel):
     """Request model for data analysis"""
     file_id: str
     session_id: Optional[str] = None
+    use_cache: bool = True  # False forces a fresh LLM call
 
 class AnalysisResponse(BaseModel):
     """Response model for data analysis"""
@@ -31,11 +41,38 @@ class AnalysisResponse(BaseModel):
     message: str
     generated_at: Optional[str] = None
 
+class AnalysisJobRequest(BaseModel):
+    """Request model for queueing an analysis job"""
+    file_id: str
+    priority: JobPriority = JobPriority.NORMAL
+    use_cache: bool = True  # False forces a fresh LLM call
+    session_id: Optional[str] = None
+
+class JobStatusResponse(BaseModel):
+    """Response model for analysis job status"""
+    success: bool
+    job_id: str
+    file_id: str
+    status: str  # queued, running, completed, failed
+    stage: str  # queued, parsing, profiling, generating_insights, storing, done, failed
+    priority: JobPriority
+    queue_position: Optional[int] = None
+    analysis_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+
 class ChartRequest(BaseModel):
     """Request model for chart generation"""
     file_id: str
     chart_type: ChartType
     column: str
+    max_points: Optional[int] = Field(None, ge=2, le=20000)  # Line chart points
+    max_columns: Optional[int] = Field(None, ge=2, le=200)  # Heatmap columns
+    y_column: Optional[str] = None  # Scatter y axis (column is the x axis)
+    method: CorrelationMethod = CorrelationMethod.PEARSON  # Heatmap correlation
     session_id: Optional[str] = None
 
 class ChartResponse(BaseModel):
@@ -50,6 +87,7 @@ class ChatRequest(BaseModel):
     file_id: str
     question: str = Field(..., min_length=1, max_length=1000)
     session_id: Optional[str] = None
+    use_cache: bool = True  # False forces a fresh LLM call
 
 class ChatResponse(BaseModel):
     """Response model for chat with data"""
@@ -58,6 +96,7 @@ class ChatResponse(BaseModel):
     answer: Optional[str] = None
     message: str
     timestamp: Optional[str] = None
+    context_tokens: Optional[Dict[str, Any]] = None  # Estimated prompt tokens per context section
 
 class InsightItem(BaseModel):
     """Model for individual insight"""
@@ -1,10 +1,8 @@
-from fastapi import APIRouter, HTTPException, Body, Depends
+from fastapi import APIRouter, HTTPException, Body, Depends, Request
 from typing import Optional
-import uuid
-from datetime import datetime
 
 from mcp.file_system import file_system
-from mcp.openai import openai_mcp
+from services.analysis_service import analysis_service
 from services.data_service import data_service
 from models.schemas import AnalysisRequest, AnalysisResponse, ErrorResponse
 from auth import require_api_token, require_rate_limit
@@ -12,35 +10,22 @@ from auth import require_api_token, require_rate_limit
 router = APIRouter(dependencies=[Depends(require_api_token), Depends(require_rate_limit)])
 
 @router.post("/analyze", response_model=AnalysisResponse)
-async def analyze_data(request: AnalysisRequest):
+async def analyze_data(request: AnalysisRequest, http_request: Request):
     try:
-        file_path = await file_system.get_file_path(request.file_id)
-
-        if not file_path:
-            raise HTTPException(status_code=404, detail="File not found")
-
-        parse_result = await data_service.parse_file(file_path)
-
-        if not parse_result["success"]:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Failed to parse file: {parse_result.get('error', 'Unknown error')}"
-            )
-
-        data_summary = parse_result["data_summary"]
-        sample_data = parse_result["sample_data"]
-
-        insights_result = await openai_mcp.generate_insights(data_summary, sample_data, file_path)
-
-        analysis_id = str(uuid.uuid4())
+        # Reuses the stored analysis while the file is unchanged
+        analysis = await analysis_service.analyze(
+            request.file_id,
+            is_disconnected=http_request.is_disconnected,
+            use_cache=request.use_cache
+        )
 
         return AnalysisResponse(
             success=True,
-            analysis_id=analysis_id,
-            data_summary=data_summary,
-            insights=insights_result,
+            analysis_id=analysis["analysis_id"],
+            data_summary=analysis["data_summary"],
+            insights=analysis["insights"],
             message="Analysis completed successfully",
-            generated_at=datetime.utcnow().isoformat()
+            generated_at=analysis["generated_at"]
         )
 
     except HTTPException:
@@ -52,14 +37,14 @@ async def analyze_data(request: AnalysisRequest):
         )
 
 @router.post("/analyze/quick")
-async def quick_analyze(file_id: str = Body(...)):
+async def quick_analyze(http_request: Request, file_id: str = Body(...)):
     try:
         file_path = await file_system.get_file_path(file_id)
 
         if not file_path:
             raise HTTPException(status_code=404, detail="File not found")
 
-        parse_result = await data_service.parse_file(file_path)
+        parse_result = await data_service.parse_file(file_path, is_disconnected=http_request.is_disconnected)
 
         if not parse_result["success"]:
             raise HTTPException(
@@ -82,9 +67,18 @@ async def quick_analyze(file_id: str = Body(...)):
             detail=str(e)
         )
 
-@router.get("/analyze/{analysis_id}")
+@router.get("/analyze/{analysis_id}", response_model=AnalysisResponse)
 async def get_analysis(analysis_id: str):
-    return {
-        "success": False,
-        "message": "Analysis storage not implemented yet"
-    }
+    analysis = analysis_service.get(analysis_id)
+
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    return AnalysisResponse(
+        success=True,
+        analysis_id=analysis["analysis_id"],
+        data_summary=analysis["data_summary"],
+        insights=analysis["insights"],
+        message="Analysis retrieved successfully",
+        generated_at=analysis["generated_at"]
+    )
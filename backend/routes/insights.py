@@ -1,17 +1,21 @@
-from fastapi import APIRouter, HTTPException, Body, Depends
-from typing import Optional
-import pandas as pd
+from fastapi import APIRouter, HTTPException, Body, Depends, Request
+from fastapi.responses import StreamingResponse
+from typing import Dict, Optional
+from contextlib import aclosing
+import json
 
 from mcp.file_system import file_system
 from mcp.openai import openai_mcp
-from services.data_service import data_service
+from services.analysis_service import analysis_service
+from services.data_service import data_service, chart_data_task
+from services.executor import task_executor
 from models.schemas import ChartRequest, ChartResponse, ChatRequest, ChatResponse, ErrorResponse, ChartType
 from auth import require_api_token, require_rate_limit
 
 router = APIRouter(dependencies=[Depends(require_api_token), Depends(require_rate_limit)])
 
 @router.post("/chart", response_model=ChartResponse)
-async def generate_chart(request: ChartRequest):
+async def generate_chart(request: ChartRequest, http_request: Request):
     try:
         file_path = await file_system.get_file_path(request.file_id)
 
@@ -19,20 +23,22 @@ async def generate_chart(request: ChartRequest):
             raise HTTPException(status_code=404, detail="File not found")
 
         file_extension = file_path.split('.')[-1].lower()
-        if file_extension == 'csv':
-            df = pd.read_csv(file_path)
-        elif file_extension in ['xlsx', 'xls']:
-            df = pd.read_excel(file_path)
-        else:
+        if file_extension not in ['csv', 'xlsx', 'xls', 'arrow']:
             raise HTTPException(status_code=400, detail="Unsupported file format")
 
-        if request.column not in df.columns:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Column '{request.column}' not found in dataset"
-            )
-
-        chart_config = data_service.get_chart_data(df, request.chart_type.value, request.column)
+        # Loads the frame and builds the chart in a pool worker; only the
+        # compact chart config comes back
+        chart_config = await task_executor.run(
+            chart_data_task,
+            file_path,
+            request.chart_type.value,
+            request.column,
+            request.max_points,
+            request.y_column,
+            request.method.value,
+            request.max_columns,
+            is_disconnected=http_request.is_disconnected
+        )
 
         if "error" in chart_config:
             raise HTTPException(status_code=400, detail=chart_config["error"])
@@ -52,15 +58,34 @@ async def generate_chart(request: ChartRequest):
             message=f"Failed to generate chart: {str(e)}"
         )
 
+def _summary_context(parse_result: Dict) -> str:
+    """Fallback chat context used when the file can't be loaded for detailed analysis"""
+    data_summary = parse_result["data_summary"]
+    sample_data = parse_result["sample_data"]
+
+    return f"""
+Dataset Summary:
+- Rows: {data_summary.get('rows', 'N/A')}
+- Columns: {data_summary.get('columns', 'N/A')}
+- Column names: {data_summary.get('column_names', [])}
+- Data types: {data_summary.get('data_types', {})}
+
+Sample Data:
+{sample_data}
+        """
+
+def _sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 @router.post("/chat", response_model=ChatResponse)
-async def chat_with_data(request: ChatRequest):
+async def chat_with_data(request: ChatRequest, http_request: Request):
     try:
         file_path = await file_system.get_file_path(request.file_id)
 
         if not file_path:
             raise HTTPException(status_code=404, detail="File not found")
 
-        parse_result = await data_service.parse_file(file_path)
+        parse_result = await data_service.parse_file(file_path, is_disconnected=http_request.is_disconnected)
 
         if not parse_result["success"]:
             raise HTTPException(
@@ -68,28 +93,17 @@ async def chat_with_data(request: ChatRequest):
                 detail=f"Failed to parse file: {parse_result.get('error', 'Unknown error')}"
             )
 
-        data_summary = parse_result["data_summary"]
-        sample_data = parse_result["sample_data"]
-
-        data_context = f"""
-Dataset Summary:
-- Rows: {data_summary.get('rows', 'N/A')}
-- Columns: {data_summary.get('columns', 'N/A')}
-- Column names: {data_summary.get('column_names', [])}
-- Data types: {data_summary.get('data_types', {})}
-
-Sample Data:
-{sample_data}
-        """
+        data_context = _summary_context(parse_result)
 
-        chat_result = await openai_mcp.chat_with_data(request.question, data_context, file_path)
+        chat_result = await openai_mcp.chat_with_data(request.question, data_context, file_path, use_cache=request.use_cache)
 
         return ChatResponse(
             success=True,
             question=request.question,
             answer=chat_result["answer"],
             message="Chat response generated successfully",
-            timestamp=chat_result["timestamp"]
+            timestamp=chat_result["timestamp"],
+            context_tokens=chat_result["context_tokens"]
         )
 
     except HTTPException:
@@ -101,32 +115,67 @@ Sample Data:
             message=f"Failed to process chat question: {str(e)}"
         )
 
-@router.get("/insights/{file_id}")
-async def get_insights(file_id: str):
-    try:
-        file_path = await file_system.get_file_path(file_id)
+@router.post("/chat/stream")
+async def stream_chat_with_data(request: ChatRequest, http_request: Request):
+    """
+    Chat with data over Server-Sent Events
 
-        if not file_path:
-            raise HTTPException(status_code=404, detail="File not found")
+    Emits "start" right away, "token" events with answer chunks as the model
+    generates them, then one "done" event with timing and token usage ("error" on failure).
+    """
+    file_path = await file_system.get_file_path(request.file_id)
 
-        parse_result = await data_service.parse_file(file_path)
+    if not file_path:
+        raise HTTPException(status_code=404, detail="File not found")
 
+    async def summary_context() -> str:
+        # Parsed inside the stream, so "start" reaches the client first
+        parse_result = await data_service.parse_file(file_path, is_disconnected=http_request.is_disconnected)
         if not parse_result["success"]:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Failed to parse file: {parse_result.get('error', 'Unknown error')}"
-            )
-
-        data_summary = parse_result["data_summary"]
-        sample_data = parse_result["sample_data"]
+            raise ValueError(f"Failed to parse file: {parse_result.get('error', 'Unknown error')}")
+        return _summary_context(parse_result)
+
+    async def event_stream():
+        # Created inside the response, so the parse only starts once streaming does
+        context = summary_context()
+        chat = openai_mcp.stream_chat_with_data(request.question, context, file_path, use_cache=request.use_cache)
+        try:
+            # aclosing releases the upstream completion as soon as the client leaves
+            async with aclosing(chat):
+                async for item in chat:
+                    if await http_request.is_disconnected():
+                        break
+                    yield _sse(item["event"], item["data"])
+        finally:
+            # No-op once awaited; otherwise stops the never-started coroutine
+            context.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Stop reverse proxies (nginx) from buffering the stream
+            "X-Accel-Buffering": "no"
+        }
+    )
 
-        insights_result = await openai_mcp.generate_insights(data_summary, sample_data, file_path)
+@router.get("/insights/{file_id:path}")
+async def get_insights(file_id: str, http_request: Request, use_cache: bool = True):
+    try:
+        # Served from the analysis store unless the file changed or use_cache=false
+        analysis = await analysis_service.analyze(
+            file_id,
+            is_disconnected=http_request.is_disconnected,
+            use_cache=use_cache
+        )
 
         return {
             "success": True,
             "file_id": file_id,
-            "insights": insights_result,
-            "data_summary": data_summary
+            "analysis_id": analysis["analysis_id"],
+            "insights": analysis["insights"],
+            "data_summary": analysis["data_summary"]
         }
 
     except HTTPException:
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, HTTPException, Depends
+
+from mcp.file_system import file_system
+from services.analysis_store import analysis_store
+from services.jobs import job_queue
+from models.schemas import AnalysisJobRequest, JobStatusResponse
+from auth import require_api_token, require_rate_limit
+
+router = APIRouter(dependencies=[Depends(require_api_token), Depends(require_rate_limit)])
+
+def _job_response(job: dict) -> JobStatusResponse:
+    result = None
+    if job["status"] == "completed":
+        analysis = analysis_store.get(job["analysis_id"])
+        if analysis:
+            result = {
+                "analysis_id": analysis["analysis_id"],
+                "data_summary": analysis["data_summary"],
+                "insights": analysis["insights"],
+                "generated_at": analysis["generated_at"]
+            }
+    return JobStatusResponse(
+        success=job["status"] != "failed",
+        result=result,
+        **{key: value for key, value in job.items() if key in JobStatusResponse.model_fields and key != "result"}
+    )
+
+@router.post("/jobs/analyze", response_model=JobStatusResponse, status_code=202)
+async def submit_analysis_job(request: AnalysisJobRequest):
+    """Queue a full analysis and return immediately; poll GET /api/jobs/{job_id}"""
+    file_path = await file_system.get_file_path(request.file_id)
+
+    if not file_path:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    job = job_queue.submit(request.file_id, priority=request.priority.value, use_cache=request.use_cache)
+    return _job_response(job)
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str):
+    """Job status and stage; includes the analysis once completed"""
+    job = job_queue.get(job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return _job_response(job)
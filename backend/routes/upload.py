@@ -1,9 +1,11 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, BackgroundTasks
 import os
 from pathlib import Path
 from typing import Optional
 
 from mcp.file_system import file_system
+from services.data_service import columnar_sidecar_task
+from services.executor import task_executor
 from models.schemas import UploadResponse, ErrorResponse
 from auth import require_api_token, require_rate_limit
 
@@ -34,25 +36,28 @@ def validate_file_type(file: UploadFile) -> None:
         )
 
 
-async def validate_file_size(file: UploadFile) -> UploadFile:
-    """Validate uploaded file size against MAX_FILE_SIZE."""
-    max_size = int(os.getenv("MAX_FILE_SIZE", 104857600))  # 100MB default
+def get_max_file_size() -> int:
+    return int(os.getenv("MAX_FILE_SIZE", 104857600))  # 100MB default
 
-    # Read once to check size, then rewind so downstream save can read again.
-    content = await file.read()
-    size = len(content)
-    await file.seek(0)
 
-    if size > max_size:
+def validate_file_size(file: UploadFile) -> None:
+    """Reject uploads whose declared size already exceeds MAX_FILE_SIZE.
+
+    This is only a cheap early check; the limit is enforced authoritatively
+    while the body is streamed to disk in save_uploaded_file.
+    """
+    max_size = get_max_file_size()
+    size = file.size
+
+    if size is not None and size > max_size:
         raise HTTPException(
             status_code=413,
             detail=f"File too large: {size} bytes. Max allowed is {max_size} bytes",
         )
 
-    return file
-
 @router.post("/upload", response_model=UploadResponse)
 async def upload_file(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     session_id: Optional[str] = None
 ):
@@ -64,9 +69,12 @@ async def upload_file(
             raise HTTPException(status_code=400, detail="No file provided")
 
         validate_file_type(file)
-        await validate_file_size(file)
+        validate_file_size(file)
+
+        file_info = await file_system.save_uploaded_file(file, max_size=get_max_file_size())
 
-        file_info = await file_system.save_uploaded_file(file)
+        # Convert to a columnar sidecar after the response is sent
+        background_tasks.add_task(task_executor.run, columnar_sidecar_task, file_info["file_path"])
 
         return UploadResponse(
             success=True,
@@ -83,7 +91,7 @@ async def upload_file(
             message=f"Failed to upload file: {str(e)}"
         )
 
-@router.get("/files/{file_id}")
+@router.get("/files/{file_id:path}")
 async def get_file_info(file_id: str):
     try:
         file_info = await file_system.get_file_info(file_id)
@@ -0,0 +1,136 @@
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from fastapi import HTTPException
+
+from mcp.file_system import file_system
+from mcp.openai import openai_mcp
+from services.analysis_store import analysis_store
+from services.data_service import data_service, columnar_sidecar_task
+from services.executor import task_executor
+from services.single_flight import single_flight
+
+
+class _StageListeners:
+    """Callers sharing one pipeline run and the stage it last reported"""
+
+    def __init__(self):
+        self.callers = 0
+        self.stage: Optional[str] = None
+        self.callbacks: List[Callable[[str], None]] = []
+
+    def report(self, stage: str) -> None:
+        self.stage = stage
+        for callback in list(self.callbacks):
+            callback(stage)
+
+
+class AnalysisService:
+    """Runs the full analysis pipeline (parse, profile, LLM insights) and stores the result"""
+
+    def __init__(self):
+        self._listeners: Dict[Hashable, _StageListeners] = {}
+
+    async def analyze(self, file_id: str,
+                      is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+                      use_cache: bool = True,
+                      on_stage: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Analyze an uploaded file, reusing the stored analysis while it is unchanged
+
+        Identical concurrent requests (same file_id, content and use_cache)
+        share one pipeline run; each caller's on_stage sees its stages, starting
+        with the current one when it joins a run already in progress.
+
+        Args:
+            file_id: Uploaded file ID
+            is_disconnected: Optional callable used to cancel when the client goes away
+            use_cache: Set False to rerun the pipeline and the LLM
+            on_stage: Optional callback receiving each stage as it starts
+                ("parsing", "profiling", "generating_insights", "storing")
+
+        Returns:
+            Dict: Stored analysis record (analysis_id, data_summary, insights,
+            generated_at) plus "reused" telling whether it came from the store
+
+        Raises:
+            HTTPException: 404 if the file doesn't exist, 400 if it can't be parsed
+        """
+        file_info = await file_system.get_file_info(file_id)
+
+        if not file_info:
+            raise HTTPException(status_code=404, detail="File not found")
+
+        key = (file_id, file_info["content_hash"], use_cache)
+        listeners = self._listeners.setdefault(key, _StageListeners())
+        listeners.callers += 1
+        if on_stage is not None:
+            listeners.callbacks.append(on_stage)
+            if listeners.stage is not None:
+                on_stage(listeners.stage)
+        try:
+            return await single_flight.run(
+                "analyze",
+                key,
+                lambda disconnected: self._analyze(file_info, disconnected, use_cache, listeners.report),
+                is_disconnected=is_disconnected
+            )
+        finally:
+            listeners.callers -= 1
+            if on_stage is not None:
+                listeners.callbacks.remove(on_stage)
+            if listeners.callers == 0 and self._listeners.get(key) is listeners:
+                del self._listeners[key]
+
+    async def _analyze(self, file_info: Dict[str, Any],
+                       is_disconnected: Optional[Callable[[], Awaitable[bool]]],
+                       use_cache: bool,
+                       on_stage: Callable[[str], None]) -> Dict[str, Any]:
+        """Run the pipeline for a resolved file (see analyze)"""
+        file_id = file_info["file_id"]
+        content_hash = file_info["content_hash"]
+        if use_cache:
+            stored = analysis_store.latest_for_file(file_id, content_hash)
+            if stored is not None:
+                return {**stored, "reused": True}
+
+        file_path = file_info["file_path"]
+
+        # Converting to the columnar sidecar (a no-op if upload already did)
+        # makes the profiling pass read a memory-mapped frame
+        on_stage("parsing")
+        await task_executor.run(columnar_sidecar_task, file_path, is_disconnected=is_disconnected)
+
+        on_stage("profiling")
+        parse_result = await data_service.parse_file(file_path, is_disconnected=is_disconnected)
+
+        if not parse_result["success"]:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Failed to parse file: {parse_result.get('error', 'Unknown error')}"
+            )
+
+        data_summary = parse_result["data_summary"]
+        sample_data = parse_result["sample_data"]
+
+        on_stage("generating_insights")
+        insights_result = await openai_mcp.generate_insights(data_summary, sample_data, file_path, use_cache=use_cache)
+
+        on_stage("storing")
+        record = analysis_store.save(
+            analysis_id=str(uuid.uuid4()),
+            file_id=file_id,
+            content_hash=content_hash,
+            data_summary=data_summary,
+            insights=insights_result,
+            generated_at=datetime.utcnow().isoformat()
+        )
+        return {**record, "reused": False}
+
+    def get(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """Stored analysis by id, or None"""
+        return analysis_store.get(analysis_id)
+
+# Global analysis service instance
+analysis_service = AnalysisService()
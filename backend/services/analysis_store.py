@@ -0,0 +1,167 @@
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from services.artifacts import _to_json
+
+# Columns of a stored analysis job
+JOB_FIELDS = (
+    "job_id", "file_id", "priority", "use_cache", "status", "stage",
+    "analysis_id", "error", "created_at", "started_at", "finished_at",
+)
+
+
+class AnalysisStore:
+    """Persistent analysis results backed by SQLite
+
+    Each analysis is stored under its analysis_id and indexed by file_id plus
+    content hash, so an unchanged file can be served its latest analysis
+    without rerunning parsing and the LLM. Analysis job records are kept in
+    the same database. Shared by every worker process.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        # Opened on first use, so importing the module creates no files
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """The database connection, opened with its schema on first use (callers hold the lock)"""
+        if self._connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS analyses (
+                    analysis_id TEXT PRIMARY KEY,
+                    file_id TEXT NOT NULL,
+                    content_hash TEXT,
+                    data_summary TEXT NOT NULL,
+                    insights TEXT NOT NULL,
+                    generated_at TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_analyses_file ON analyses (file_id, content_hash, generated_at)"
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    file_id TEXT NOT NULL,
+                    priority TEXT NOT NULL,
+                    use_cache INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    analysis_id TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished_at)")
+            self._connection = conn
+        return self._connection
+
+    def save(self, analysis_id: str, file_id: str, content_hash: Optional[str],
+             data_summary: Dict, insights: Dict, generated_at: str) -> Dict[str, Any]:
+        """Store an analysis and return it as a record"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses "
+                "(analysis_id, file_id, content_hash, data_summary, insights, generated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    analysis_id,
+                    file_id,
+                    content_hash,
+                    json.dumps(data_summary, default=_to_json),
+                    json.dumps(insights, default=_to_json),
+                    generated_at,
+                )
+            )
+        return {
+            "analysis_id": analysis_id,
+            "file_id": file_id,
+            "content_hash": content_hash,
+            "data_summary": data_summary,
+            "insights": insights,
+            "generated_at": generated_at,
+        }
+
+    def get(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """Look up an analysis by id"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM analyses WHERE analysis_id = ?", (analysis_id,)
+            ).fetchone()
+        return self._record(row)
+
+    def latest_for_file(self, file_id: str, content_hash: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Most recent analysis of file_id while its content is unchanged"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM analyses WHERE file_id = ? AND content_hash IS ? "
+                "ORDER BY generated_at DESC LIMIT 1",
+                (file_id, content_hash)
+            ).fetchone()
+        return self._record(row)
+
+    def remove_file(self, file_id: str) -> int:
+        """Delete every analysis of a file and its sheets (e.g. when the upload is deleted)"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM analyses WHERE file_id = ? OR file_id LIKE ?",
+                (file_id, f"{file_id}/%")
+            )
+            return cursor.rowcount
+
+    def save_job(self, job: Dict[str, Any]) -> None:
+        """Insert or update an analysis job record"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs "
+                "(job_id, file_id, priority, use_cache, status, stage, analysis_id, error, "
+                "created_at, started_at, finished_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                tuple(job[key] for key in JOB_FIELDS)
+            )
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Look up an analysis job by id"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["use_cache"] = bool(job["use_cache"])
+        return job
+
+    def prune_jobs(self, finished_before: str) -> int:
+        """Delete job records that finished before the given ISO timestamp"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM jobs WHERE finished_at < ?", (finished_before,))
+            return cursor.rowcount
+
+    def _record(self, row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        record = dict(row)
+        record["data_summary"] = json.loads(record["data_summary"])
+        record["insights"] = json.loads(record["insights"])
+        return record
+
+# Global analysis store instance
+analysis_store = AnalysisStore(
+    Path(os.getenv("ANALYSIS_DB_PATH", os.path.join(os.getenv("UPLOAD_DIR", "./uploads"), "analyses.db")))
+)
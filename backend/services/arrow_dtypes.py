@@ -0,0 +1,109 @@
+import os
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow is optional; without it files load with default dtypes
+    pa = None
+
+# Opt-in: load files with Arrow-backed string/nullable dtypes and
+# dictionary-encode low-cardinality text columns
+ARROW_DTYPES = os.getenv("ARROW_DTYPES", "false").lower() == "true"
+# Text columns whose distinct values are at most this share of their
+# non-missing values are dictionary-encoded
+DICTIONARY_MAX_UNIQUE_RATIO = float(os.getenv("DICTIONARY_MAX_UNIQUE_RATIO", 0.5))
+# Rows read with default dtypes to estimate the memory the default path would use
+MEMORY_SAMPLE_ROWS = 10_000
+
+
+def is_enabled() -> bool:
+    """Whether files are loaded with Arrow-backed dtypes"""
+    return ARROW_DTYPES and pa is not None
+
+
+def read_csv(file_path: str) -> pd.DataFrame:
+    """Read a CSV straight into Arrow memory with Arrow's multithreaded parser"""
+    return dictionary_encode(pd.read_csv(file_path, engine="pyarrow", dtype_backend="pyarrow"))
+
+
+def read_excel(file_path: str) -> pd.DataFrame:
+    """Read an Excel file into Arrow-backed dtypes"""
+    # Converted after reading: dtype_backend="pyarrow" rejects the mixed
+    # number/text columns common in spreadsheets, which stay object here
+    return dictionary_encode(pd.read_excel(file_path).convert_dtypes(dtype_backend="pyarrow"))
+
+
+def dictionary_encode(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Store low-cardinality text columns as categoricals
+
+    Each distinct value is kept once and rows hold small integer codes.
+    Categoricals are profiled, charted and matched like any other text column.
+    """
+    encoded = {}
+    for col in df.select_dtypes(include=["object", "string"]).columns:
+        series = df[col]
+        if pd.api.types.infer_dtype(series, skipna=True) != "string":
+            # Mixed number/text columns are left as they are
+            continue
+        present = series.count()
+        if present and series.nunique() <= DICTIONARY_MAX_UNIQUE_RATIO * present:
+            encoded[col] = series.astype("category")
+    return df.assign(**encoded) if encoded else df
+
+
+def read_default_sample(file_path: str) -> pd.DataFrame:
+    """First MEMORY_SAMPLE_ROWS rows of a file with default dtypes"""
+    suffix = Path(file_path).suffix.lower()
+    if suffix == ".csv":
+        return pd.read_csv(file_path, nrows=MEMORY_SAMPLE_ROWS)
+    if suffix == ".arrow":
+        # A converted sheet: its plain pandas conversion, with dictionary
+        # columns decoded, stands in for default dtypes
+        with pa.memory_map(file_path, "r") as source:
+            sample = pa.ipc.open_file(source).read_all().slice(0, MEMORY_SAMPLE_ROWS).to_pandas()
+        return sample.assign(**{
+            col: sample[col].astype(sample[col].cat.categories.dtype)
+            for col in sample.select_dtypes(include="category").columns
+        })
+    return pd.read_excel(file_path, nrows=MEMORY_SAMPLE_ROWS)
+
+
+def sidecar_types_mapper(arrow_type: "pa.DataType"):
+    """
+    types_mapper for Table.to_pandas that keeps sidecar columns Arrow-backed
+
+    Dictionary columns return None so they come back as pandas categoricals.
+    """
+    if pa.types.is_dictionary(arrow_type):
+        return None
+    return pd.ArrowDtype(arrow_type)
+
+
+def memory_report(df: pd.DataFrame, default_sample: pd.DataFrame) -> Dict:
+    """
+    Memory of df next to what default dtypes would use for the same rows
+
+    Args:
+        df: Frame loaded with Arrow-backed dtypes
+        default_sample: First rows of the same file read with default dtypes
+
+    Returns:
+        Dict: Bytes before (default dtypes, extrapolated from the sample when
+            the file is longer) and after, plus the dictionary-encoded columns
+    """
+    sample_bytes = int(default_sample.memory_usage(deep=True, index=False).sum())
+    before = sample_bytes * len(df) // len(default_sample) if len(default_sample) else 0
+    after = int(df.memory_usage(deep=True, index=False).sum())
+    dictionary_columns: List[str] = [col for col, dtype in df.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    return {
+        "dtype_backend": "pyarrow",
+        "memory_usage_before": before,
+        "memory_usage_after": after,
+        "memory_saved_percentage": float((before - after) / before * 100) if before else 0.0,
+        "before_estimated": len(default_sample) < len(df),
+        "dictionary_encoded_columns": dictionary_columns,
+    }
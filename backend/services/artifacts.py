@@ -0,0 +1,73 @@
+import glob
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+ARTIFACT_DIR = ".artifacts"
+
+
+def artifact_path(file_path: str, kind: str) -> Path:
+    """Location of a derived JSON artifact (summary, insights, ...) for a stored file"""
+    source = Path(file_path)
+    return source.parent / ARTIFACT_DIR / f"{source.name}.{kind}.json"
+
+
+def _source_version(file_path: str) -> str:
+    stat = os.stat(file_path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _to_json(value: Any) -> Any:
+    # numpy/pandas scalars expose .item(); anything else is stringified
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def load_artifact(file_path: str, kind: str) -> Optional[Any]:
+    """
+    Load a derived artifact for file_path
+
+    Stored files are content-addressed, so an artifact keyed by the blob path is
+    shared by every upload of the same bytes.
+
+    Returns:
+        The stored data, or None if missing or older than the source file
+    """
+    path = artifact_path(file_path, kind)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            record = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read artifact {path}: {e}")
+        return None
+    if record.get("source_version") != _source_version(file_path):
+        return None
+    return record.get("data")
+
+
+def save_artifact(file_path: str, kind: str, data: Any) -> None:
+    """Persist a derived artifact atomically next to the stored file"""
+    path = artifact_path(file_path, kind)
+    path.parent.mkdir(exist_ok=True)
+    record = {"source_version": _source_version(file_path), "data": data}
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f, default=_to_json)
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"Warning: Could not write artifact {path}: {e}")
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def remove_artifacts(file_path: str) -> None:
+    """Delete every derived artifact for file_path"""
+    source = Path(file_path)
+    for path in (source.parent / ARTIFACT_DIR).glob(f"{glob.escape(source.name)}.*.json"):
+        path.unlink()
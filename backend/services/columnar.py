@@ -0,0 +1,158 @@
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+from services import arrow_dtypes
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow is optional; without it every read goes to the raw file
+    pa = None
+
+SIDECAR_DIR = ".columnar"
+SIDECAR_SUFFIX = ".arrow"
+_SOURCE_VERSION_KEY = b"datrep.source_version"
+
+
+def is_available() -> bool:
+    """Whether columnar sidecars can be written and read"""
+    return pa is not None
+
+
+def sidecar_path(file_path: str) -> Path:
+    """Location of the Arrow IPC sidecar for an uploaded file"""
+    source = Path(file_path)
+    return source.parent / SIDECAR_DIR / f"{source.name}{SIDECAR_SUFFIX}"
+
+
+def _source_version(file_path: str) -> bytes:
+    stat = os.stat(file_path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}".encode()
+
+
+def _arrow_table(df: pd.DataFrame) -> "pa.Table":
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Spreadsheet columns often mix numbers and text; store those as text
+        mixed = {}
+        for col in df.select_dtypes(include=["object"]).columns:
+            try:
+                pa.array(df[col], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                mixed[col] = df[col].map(lambda value: value if isinstance(value, str) or pd.isna(value) else str(value))
+        return pa.Table.from_pandas(df.assign(**mixed), preserve_index=False)
+
+
+def write_dataset(target: Path, df: pd.DataFrame, metadata: Optional[Dict[bytes, bytes]] = None) -> Path:
+    """
+    Write df as an uncompressed Arrow IPC file
+
+    Uncompressed IPC files can be memory-mapped instead of re-parsing the
+    source (see read_dataset for what stays shared between workers).
+    The write goes to a temp file and is renamed into place atomically.
+    """
+    table = _arrow_table(df)
+    if metadata:
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+
+    tmp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    try:
+        with pa.OSFile(str(tmp_path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, target)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return target
+
+
+def read_dataset(path: Path) -> pd.DataFrame:
+    """
+    Load a memory-mapped Arrow IPC file (see write_dataset)
+
+    Numeric columns without missing values become zero-copy views of the map,
+    so every worker reading the file shares those pages in the OS page cache.
+    Text columns and columns with missing values are converted into the
+    reader's own memory. Arrow-backed dtypes (ARROW_DTYPES) keep every
+    column except dictionaries as a view.
+    """
+    with pa.memory_map(str(path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+        if arrow_dtypes.is_enabled():
+            return table.to_pandas(types_mapper=arrow_dtypes.sidecar_types_mapper)
+        # One block per column, so columns are not consolidated into copies;
+        # converted buffers are released as conversion goes
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def is_dataset(file_path: str) -> bool:
+    """Whether file_path is itself a columnar dataset (e.g. a converted Excel sheet)"""
+    return Path(file_path).suffix.lower() == SIDECAR_SUFFIX
+
+
+def write_sidecar(file_path: str, df: pd.DataFrame) -> Optional[Path]:
+    """
+    Write df as an Arrow IPC sidecar next to the original upload
+
+    Returns:
+        Path of the sidecar, or None when pyarrow is unavailable
+    """
+    if pa is None:
+        return None
+
+    target = sidecar_path(file_path)
+    target.parent.mkdir(exist_ok=True)
+    return write_dataset(target, df, {_SOURCE_VERSION_KEY: _source_version(file_path)})
+
+
+def has_fresh_sidecar(file_path: str) -> bool:
+    """Whether an up-to-date sidecar already exists (reads only the schema)"""
+    if pa is None:
+        return False
+
+    path = sidecar_path(file_path)
+    if not path.exists():
+        return False
+
+    try:
+        with pa.memory_map(str(path), "r") as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowException):
+        return False
+    return metadata.get(_SOURCE_VERSION_KEY) == _source_version(file_path)
+
+
+def read_sidecar(file_path: str) -> Optional[pd.DataFrame]:
+    """
+    Load the memory-mapped sidecar for file_path
+
+    Returns:
+        DataFrame, or None if there is no sidecar or it is older than the source
+    """
+    if pa is None:
+        return None
+
+    path = sidecar_path(file_path)
+    if not path.exists():
+        return None
+
+    try:
+        with pa.memory_map(str(path), "r") as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+        if metadata.get(_SOURCE_VERSION_KEY) != _source_version(file_path):
+            return None
+        return read_dataset(path)
+    except (OSError, pa.ArrowException) as e:
+        print(f"Warning: Could not read columnar sidecar {path}: {e}")
+        return None
+
+
+def remove_sidecar(file_path: str) -> None:
+    """Delete the sidecar for file_path if present"""
+    path = sidecar_path(file_path)
+    if path.exists():
+        path.unlink()
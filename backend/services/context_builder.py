@@ -0,0 +1,356 @@
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.correlation import top_pairs
+from services.data_service import data_service
+from services import streaming_profile
+from services.profiling import DatasetProfile
+
+# Estimated prompt tokens spent on the chat data context
+CHAT_CONTEXT_TOKEN_BUDGET = int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", 4000))
+# Rough characters per token used for estimates (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+# Share of the budget each summary section may use before rows get the rest
+SECTION_BUDGET_SHARE = 0.25
+# Columns included in the row sample, most relevant first
+MAX_CONTEXT_COLUMNS = 15
+# Numeric columns whose min/max rows are always included
+MAX_ANCHOR_COLUMNS = 3
+# Categorical columns with more distinct values are not scanned for value matches
+MAX_MATCH_CARDINALITY = 10_000
+# Longest value (in words) matched against the question
+MAX_MATCH_VALUE_WORDS = 6
+# Correlation pairs listed in prompts: minimum |r| and a hard cap for chat
+# (insights list the strongest INSIGHTS_CORRELATION_PAIRS)
+CORRELATION_PAIR_THRESHOLD = float(os.getenv("CORRELATION_PAIR_THRESHOLD", 0.3))
+MAX_CORRELATION_PAIRS = int(os.getenv("MAX_CORRELATION_PAIRS", 20))
+INSIGHTS_CORRELATION_PAIRS = 5
+
+# Question words that carry no signal for column or value matching
+STOP_WORDS = {
+    "the", "of", "in", "on", "at", "to", "for", "and", "or", "is", "are", "was", "were",
+    "what", "which", "who", "how", "many", "much", "does", "do", "did", "by", "with",
+    "me", "show", "tell", "give", "my", "data", "dataset", "an", "it", "its", "this", "that",
+}
+
+
+def _num(value: Optional[float]) -> float:
+    """Profile statistics are None for all-missing columns; format those as nan"""
+    return float("nan") if value is None else value
+
+
+def detailed_data_context(df: pd.DataFrame, profile: DatasetProfile) -> str:
+    """Create detailed context from the dataset profile and a sample of rows"""
+    context_parts = []
+
+    # Add key statistics with specific examples
+    numeric_cols = profile.numeric
+    categorical_cols = profile.categorical
+
+    if len(numeric_cols) > 0:
+        context_parts.append("📊 Numeric Columns Analysis (use these EXACT numbers in insights):")
+        grand_total = profile.grand_total
+        for col in numeric_cols[:10]:  # Include more columns for revenue-type data
+            pct = (col.sum / grand_total * 100) if grand_total > 0 else 0
+            context_parts.append(f"- {col.name}: sum={col.sum:,.2f} ({pct:.1f}% of total), mean={_num(col.mean):.2f}, min={_num(col.min):.2f}, max={_num(col.max):.2f}")
+
+    if len(categorical_cols) > 0:
+        context_parts.append("🏷️ Categorical Columns Analysis:")
+        for col in categorical_cols[:5]:  # Limit to first 5 columns
+            top_values = dict(col.top_values[:3])
+            context_parts.append(f"- {col.name}: top values = {top_values}")
+
+            # Find most common and least common
+            if col.top_values:
+                most_common, most_common_count = col.top_values[0]
+                context_parts.append(f"  Most common: {most_common} ({most_common_count} times)")
+            if col.least_common is not None:
+                least_common, least_common_count = col.least_common
+                context_parts.append(f"  Least common: {least_common} ({least_common_count} times)")
+
+    # Add correlation analysis for numeric columns with specific examples
+    if len(profile.correlation_columns) >= 2:
+        pairs = top_pairs(
+            profile.correlation_matrix(),
+            profile.correlation_columns,
+            min(INSIGHTS_CORRELATION_PAIRS, MAX_CORRELATION_PAIRS),
+            CORRELATION_PAIR_THRESHOLD
+        )
+        if pairs:
+            context_parts.append("🔗 Strong Correlations:")
+            context_parts.extend(f"{a} & {b}: {value:.3f}" for a, b, value in pairs)
+
+    # Add outlier analysis
+    if len(numeric_cols) > 0:
+        context_parts.append("🎯 Outlier Analysis:")
+        for col in numeric_cols[:3]:
+            if col.outlier_count > 0:
+                context_parts.append(f"- {col.name}: {col.outlier_count} outliers found")
+                # Show specific outlier values
+                context_parts.append(f"  Outlier values: {list(col.outlier_values[:3])}")
+
+    # Add sample data with more context
+    if len(df) < profile.rows:
+        context_parts.append(f"📋 Sample Data (5 rows of an evenly spaced {len(df)}-row sample of all {profile.rows} rows; statistics above cover every row):")
+    else:
+        context_parts.append("📋 Sample Data (first 5 rows with all columns):")
+    context_parts.append(df.head(5).to_string())
+
+    return "\n".join(context_parts)
+
+
+class _TokenBudget:
+    """Accumulates context sections line by line until the token budget is spent"""
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.used = 0
+        self.parts: List[str] = []
+        self.sections: Dict[str, int] = {}
+
+    @property
+    def remaining(self) -> int:
+        return self.budget - self.used
+
+    def add(self, name: str, lines: Iterable[str], limit: Optional[int] = None) -> None:
+        """Add lines in order, stopping at the section limit or the overall budget"""
+        limit = self.remaining if limit is None else min(limit, self.remaining)
+        used = 0
+        for line in lines:
+            cost = estimate_tokens(line) + 1
+            if used + cost > limit:
+                break
+            self.parts.append(line)
+            used += cost
+        if used:
+            self.used += used
+            self.sections[name] = self.sections.get(name, 0) + used
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count (~4 characters per token for English and numbers)"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _terms(text: str) -> Set[str]:
+    """Lowercase words of a question or column name, with naive plural stripping"""
+    words = {word for word in re.findall(r"[a-z0-9]+", text.lower()) if len(word) > 1 and word not in STOP_WORDS}
+    return words | {word[:-1] for word in words if len(word) > 3 and word.endswith("s")}
+
+
+def _mention_spans(question_lower: str) -> Set[str]:
+    """
+    Every text the question holds between two word boundaries, i.e. every
+    value v for which \\bv\\b occurs in the question
+    """
+    bounds = [m.start() for m in re.finditer(r"\b", question_lower)]
+    return {
+        question_lower[start:end]
+        for k, start in enumerate(bounds)
+        for end in bounds[k + 1:k + 1 + 2 * MAX_MATCH_VALUE_WORDS]
+        if end - start > 1
+    }
+
+
+def _value_matches(df: pd.DataFrame, profile: DatasetProfile, question: str) -> Dict[str, List[Any]]:
+    """Values of each column that the question mentions literally"""
+    question_lower = question.lower()
+    # Short numbers ("top 5") are too ambiguous to match against values
+    numbers = {float(n) for n in re.findall(r"-?\d+(?:\.\d+)?", question) if len(n) >= 3}
+    spans = _mention_spans(question_lower)
+    matches = {}
+    for col in profile.categorical:
+        if not spans or col.unique_values is None or col.unique_values > MAX_MATCH_CARDINALITY:
+            continue
+        # One hash lookup per distinct value of the column
+        values = pd.Series(df[col.name].dropna().unique())
+        found = values[values.astype(str).str.lower().isin(spans).to_numpy(dtype=bool)]
+        if len(found):
+            matches[col.name] = found.tolist()
+    if numbers:
+        for col in profile.numeric:
+            hits = [n for n in numbers if df[col.name].eq(n).any()]
+            if hits:
+                matches[col.name] = hits
+    return matches
+
+
+def _rank_columns(df: pd.DataFrame, question: str, value_matches: Dict[str, List[Any]]) -> List[str]:
+    """Columns ordered by relevance to the question, ties kept in file order"""
+    question_lower = question.lower()
+    question_terms = _terms(question)
+    scores = {}
+    for position, col in enumerate(df.columns):
+        name = str(col)
+        score = 3 if name.lower() in question_lower else 0
+        score += len(_terms(name) & question_terms)
+        score += 2 if col in value_matches else 0
+        scores[col] = (-score, position)
+    return sorted(df.columns, key=lambda col: scores[col])
+
+
+def _rank_rows(df: pd.DataFrame, profile: DatasetProfile, columns: List[str],
+               value_matches: Dict[str, List[Any]], limit: int) -> List[Any]:
+    """
+    Row labels in prompt order: rows matching values from the question, then
+    the extremes of the most relevant numeric columns, then an evenly spaced
+    sample of the remaining rows
+    """
+    selected: Dict[Any, None] = {}
+
+    if value_matches:
+        hits = pd.Series(0, index=df.index)
+        for col, values in value_matches.items():
+            hits += df[col].isin(values).to_numpy()
+        matched = hits[hits > 0].sort_values(ascending=False, kind="stable")
+        selected.update(dict.fromkeys(matched.index[:limit]))
+
+    numeric_names = {col.name for col in profile.numeric}
+    for name in [col for col in columns if col in numeric_names][:MAX_ANCHOR_COLUMNS]:
+        col = profile.column(name)
+        for label in (col.argmax, col.argmin):
+            if label is not None and label in df.index:
+                selected[label] = None
+
+    remaining = limit - len(selected)
+    if remaining > 0 and len(df) > 0:
+        positions = np.unique(np.linspace(0, len(df) - 1, min(remaining, len(df))).astype(int))
+        for label in df.index[positions]:
+            selected[label] = None
+
+    return list(selected)[:limit]
+
+
+def chat_data_context(df: pd.DataFrame, question: str, profile: DatasetProfile,
+                      token_budget: int = CHAT_CONTEXT_TOKEN_BUDGET) -> Dict[str, Any]:
+    """
+    Create context specific to the user's question within a token budget
+
+    Columns and rows are ranked by relevance to the question (column-name and
+    literal value matches). Totals and question-specific statistics are added
+    first, then as many relevant rows as fit, encoded as compact CSV.
+
+    Returns:
+        Dict: context text, estimated tokens per section and in total
+    """
+    question_lower = question.lower()
+    budget = _TokenBudget(token_budget)
+    value_matches = _value_matches(df, profile, question)
+    ranked_columns = _rank_columns(df, question, value_matches)
+
+    # Numeric columns ordered by relevance to the question
+    numeric_by_name = {col.name: col for col in profile.numeric}
+    numeric_cols = [numeric_by_name[name] for name in ranked_columns if name in numeric_by_name]
+    section_limit = int(token_budget * SECTION_BUDGET_SHARE)
+
+    # ALWAYS add pre-computed column sums first - critical for "total X" questions
+    if len(numeric_cols) > 0:
+        grand_total = profile.grand_total
+        lines = ["PRE-COMPUTED COLUMN TOTALS (use these for 'total', 'sum', 'how much' - e.g. 'total sales' = Gross Sales or Net Sales sum):"]
+        for col in numeric_cols:
+            pct = (col.sum / grand_total * 100) if grand_total > 0 else 0
+            lines.append(f'- "{col.name}": sum={col.sum:,.2f} ({pct:.1f}% of total)')
+        lines.append("")
+        budget.add("totals", lines, limit=section_limit)
+
+    # Add relevant data based on question type
+    lines = []
+    if any(word in question_lower for word in ['trend', 'pattern', 'correlation']):
+        if len(profile.correlation_columns) >= 2:
+            pairs = top_pairs(
+                profile.correlation_matrix(),
+                profile.correlation_columns,
+                MAX_CORRELATION_PAIRS,
+                CORRELATION_PAIR_THRESHOLD
+            )
+            lines.append(f"🔗 Correlation Analysis (strongest pairs with |r| > {CORRELATION_PAIR_THRESHOLD}):")
+            lines.extend(f"- {a} vs {b}: {value:.3f}" for a, b, value in pairs)
+            if not pairs:
+                lines.append("- No column pairs are correlated above the threshold")
+
+    if any(word in question_lower for word in ['outlier', 'anomaly', 'extreme']):
+        lines.append("🎯 Outlier Analysis:")
+        for col in numeric_cols[:3]:
+            if col.outlier_count > 0:
+                lines.append(f"- {col.name}: {col.outlier_count} outliers found")
+                # Show specific outlier values and their context
+                lines.append(f"  Outlier values: {list(col.outlier_values[:3])}")
+
+    if any(word in question_lower for word in ['distribution', 'spread', 'range']):
+        lines.append("📊 Distribution Analysis:")
+        for col in numeric_cols[:3]:
+            lines.append(f"- {col.name}: mean={_num(col.mean):.2f}, std={_num(col.std):.2f}, range={_num(col.max)-_num(col.min):.2f}")
+
+    if any(word in question_lower for word in ['highest', 'maximum', 'top', 'best']):
+        lines.append("🏆 Highest Values:")
+        for col in numeric_cols[:3]:
+            lines.append(f"- {col.name}: {_num(col.max):.2f}" + (f" (row {col.argmax})" if col.argmax is not None else ""))
+
+    if any(word in question_lower for word in ['lowest', 'minimum', 'bottom', 'worst']):
+        lines.append("📉 Lowest Values:")
+        for col in numeric_cols[:3]:
+            lines.append(f"- {col.name}: {_num(col.min):.2f}" + (f" (row {col.argmin})" if col.argmin is not None else ""))
+
+    if any(word in question_lower for word in ['average', 'mean', 'median']):
+        lines.append("📈 Average Values:")
+        for col in numeric_cols[:3]:
+            lines.append(f"- {col.name}: mean={_num(col.mean):.2f}, median={_num(col.median):.2f}")
+
+    if value_matches:
+        lines.append("🔎 Values mentioned in the question:")
+        for col, values in value_matches.items():
+            lines.append(f"- {col}: {values[:5]}")
+
+    budget.add("statistics", lines, limit=section_limit)
+
+    # Spend the rest of the budget on the most relevant rows and columns
+    columns = ranked_columns[:MAX_CONTEXT_COLUMNS]
+    columns = [col for col in df.columns if col in columns]
+    header_tokens = estimate_tokens(",".join(map(str, columns))) + 1
+    row_estimate = estimate_tokens(df.head(20)[columns].to_csv(index=False, float_format="%.6g")) / max(min(len(df), 20), 1)
+    row_limit = max(0, int((budget.remaining - header_tokens) / max(row_estimate, 1)))
+    if row_limit > 0 and len(df) > 0:
+        rows = _rank_rows(df, profile, ranked_columns, value_matches, row_limit)
+        csv_lines = df.loc[rows, columns].to_csv(index_label="row", float_format="%.6g").splitlines()
+        omitted = f", {len(df.columns) - len(columns)} less relevant columns omitted" if len(columns) < len(df.columns) else ""
+        sampled = f" in an evenly spaced {len(df)}-row sample" if len(df) < profile.rows else ""
+        title = f"📋 Relevant Rows (CSV, up to {len(rows)} of {profile.rows} rows{sampled}{omitted}; matching rows first):"
+        budget.add("rows", [title] + csv_lines)
+
+    return {
+        "context": "\n".join(budget.parts),
+        "sections": budget.sections,
+        "total_tokens": budget.used,
+        "token_budget": token_budget,
+    }
+
+
+def _context_frame(file_path: str) -> Tuple[pd.DataFrame, DatasetProfile]:
+    """
+    Rows and profile to build prompts from
+
+    Files too large to parse whole (see streaming_profile.should_stream) use
+    the chunked summary's statistics and an evenly spaced sample of rows.
+    """
+    if streaming_profile.should_stream(file_path):
+        parsed = data_service.parse_file_sync(file_path)
+        if not parsed["success"]:
+            raise ValueError(parsed["error"])
+        return data_service.load_sample(file_path), streaming_profile.summary_profile(parsed["data_summary"])
+    df = data_service.load_dataframe(file_path)
+    return df, data_service.get_profile(file_path, df)
+
+
+# Entry points for the process pool: take a file path, return prompt text
+
+def insights_context_task(file_path: str) -> str:
+    return detailed_data_context(*_context_frame(file_path))
+
+
+def chat_context_task(file_path: str, question: str) -> Dict[str, Any]:
+    df, profile = _context_frame(file_path)
+    return chat_data_context(df, question, profile)
@@ -0,0 +1,98 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Supported correlation methods
+METHODS = ("pearson", "spearman")
+
+
+def correlation_matrix(df: pd.DataFrame, columns: List[str], method: str = "pearson") -> np.ndarray:
+    """
+    Correlation matrix of numeric columns with pairwise handling of missing data
+
+    Each pair uses only the rows where both columns are present. Spearman is
+    computed as Pearson on per-column ranks (average ranks for ties), so no
+    SciPy dependency is needed; ranks are taken over each column's non-missing
+    values.
+
+    Args:
+        df: Pandas DataFrame
+        columns: Numeric columns to correlate
+        method: "pearson" or "spearman"
+
+    Returns:
+        np.ndarray: len(columns) x len(columns) matrix (NaN where undefined)
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unsupported correlation method: {method}")
+    frame = df[columns]
+    if method == "spearman":
+        frame = frame.rank()
+    return frame.corr().to_numpy()
+
+
+def top_columns(matrix: np.ndarray, n: int, pinned: Optional[int] = None) -> np.ndarray:
+    """
+    Positions of the n columns with the strongest correlation to any other column
+
+    Args:
+        matrix: Square correlation matrix
+        n: Number of columns to keep
+        pinned: Optional position that is always kept
+
+    Returns:
+        np.ndarray: Selected positions in their original order
+    """
+    size = len(matrix)
+    if size <= n:
+        return np.arange(size)
+
+    strength = np.abs(matrix)
+    np.fill_diagonal(strength, np.nan)
+    strength = np.where(np.isnan(strength), -1.0, strength).max(axis=1)
+    if pinned is not None:
+        strength[pinned] = np.inf
+    return np.sort(np.argpartition(-strength, n - 1)[:n])
+
+
+def top_pairs(matrix: np.ndarray, columns: Sequence[str], k: int,
+              threshold: float = 0.0) -> List[Tuple[str, str, float]]:
+    """
+    The k most strongly correlated column pairs, strongest first
+
+    Vectorized: the upper triangle (each pair once, no diagonal) is masked by
+    |r| > threshold and argpartition selects the top k of the survivors, so
+    only k pairs are ever sorted or formatted.
+
+    Args:
+        matrix: Square correlation matrix
+        columns: Column names in matrix order
+        k: Maximum number of pairs
+        threshold: Pairs with |r| at or below this are skipped (NaN always is)
+
+    Returns:
+        List[Tuple[str, str, float]]: (column, column, coefficient) tuples
+    """
+    if k <= 0 or len(matrix) < 2:
+        return []
+    strength = np.abs(matrix)
+    with np.errstate(invalid="ignore"):
+        mask = np.triu(strength > threshold, k=1)
+    rows, cols = np.nonzero(mask)
+    values = strength[rows, cols]
+    if len(values) > k:
+        keep = np.argpartition(-values, k - 1)[:k]
+        rows, cols, values = rows[keep], cols[keep], values[keep]
+    order = np.argsort(-values, kind="stable")
+    return [(columns[i], columns[j], float(matrix[i, j])) for i, j in zip(rows[order], cols[order])]
+
+
+def matrix_rows(matrix: np.ndarray) -> List[List[Optional[float]]]:
+    """JSON-friendly rows with None for undefined coefficients"""
+    return [[None if np.isnan(value) else float(value) for value in row] for row in matrix]
+
+
+def matrix_from_rows(rows: Sequence[Sequence[Optional[float]]]) -> np.ndarray:
+    """Inverse of matrix_rows"""
+    return np.array(rows, dtype="float64").reshape(len(rows), len(rows))
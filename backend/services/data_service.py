@@ -1,49 +1,88 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
 import json
+import os
 from datetime import datetime
 
+from services import arrow_dtypes, artifacts, columnar, correlation, profiling, schema as schema_inference, streaming_profile, trends as trend_engine, workbooks
+from services.dataset_cache import dataset_cache
+from services.downsample import downsample_indices, stratified_sample_indices
+from services.executor import task_executor
+from services.single_flight import single_flight
+
+# Default number of points returned for line charts
+LINE_CHART_MAX_POINTS = int(os.getenv("LINE_CHART_MAX_POINTS", 1000))
+# Scatter charts with more points than this are binned into a 2-D histogram
+SCATTER_MAX_POINTS = int(os.getenv("SCATTER_MAX_POINTS", 5000))
+# Grid size per axis and raw points kept alongside the binned counts
+SCATTER_BINS = 50
+SCATTER_SAMPLE_POINTS = 500
+# Columns shown in a correlation heatmap of a wide frame
+HEATMAP_MAX_COLUMNS = int(os.getenv("HEATMAP_MAX_COLUMNS", 30))
+
 class DataService:
     """Service for data processing and analysis"""
     
     def __init__(self):
         self.supported_formats = {'.csv', '.xlsx', '.xls'}
     
-    async def parse_file(self, file_path: str) -> Dict:
+    async def parse_file(self, file_path: str,
+                         is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None) -> Dict:
         """
         Parse uploaded file and return data summary
         
+        Runs in the bounded process pool so large files don't block the event loop.
+        
         Args:
             file_path: Path to the uploaded file
+            is_disconnected: Optional callable used to cancel when the client goes away
             
         Returns:
             Dict: Data summary including statistics and sample
         """
+        # Stored paths are content-addressed, so concurrent parses of the same
+        # bytes share one pool task
+        return await single_flight.run(
+            "parse_file",
+            file_path,
+            lambda disconnected: task_executor.run(parse_file_task, file_path, is_disconnected=disconnected),
+            is_disconnected=is_disconnected
+        )
+    
+    def parse_file_sync(self, file_path: str) -> Dict:
+        """Parse a file in the current process (see parse_file)"""
         try:
-            # Determine file type and parse accordingly
-            file_extension = Path(file_path).suffix.lower()
+            # Stored files are content-addressed, so a re-upload of the same
+            # bytes picks up the summary computed for the first upload
+            stored = artifacts.load_artifact(file_path, "summary")
+            if stored is not None:
+                return stored
             
-            if file_extension == '.csv':
-                df = pd.read_csv(file_path)
-            elif file_extension in {'.xlsx', '.xls'}:
-                df = pd.read_excel(file_path)
+            if streaming_profile.should_stream(file_path):
+                # Very large files are summarized chunk by chunk so parsing
+                # never holds the whole frame in memory
+                summary, sample_data = streaming_profile.streaming_summary(file_path)
             else:
-                raise ValueError(f"Unsupported file format: {file_extension}")
-            
-            # Generate data summary
-            summary = self._generate_data_summary(df)
-            
-            # Get sample data
-            sample_data = self._get_sample_data(df)
+                df = self.load_dataframe(file_path)
+                
+                # Generate data summary from the shared dataset profile
+                summary = self._generate_data_summary(df, self.get_schema(file_path, df), self.get_profile(file_path, df))
+                if arrow_dtypes.is_enabled():
+                    summary["memory_optimization"] = arrow_dtypes.memory_report(df, arrow_dtypes.read_default_sample(file_path))
+                
+                # Get sample data
+                sample_data = self._get_sample_data(df)
             
-            return {
+            result = {
                 "success": True,
                 "data_summary": summary,
                 "sample_data": sample_data,
                 "parsed_at": datetime.utcnow().isoformat()
             }
+            artifacts.save_artifact(file_path, "summary", result)
+            return result
             
         except Exception as e:
             return {
@@ -52,50 +91,178 @@ class DataService:
                 "parsed_at": datetime.utcnow().isoformat()
             }
     
-    def _generate_data_summary(self, df: pd.DataFrame) -> Dict:
+    def load_dataframe(self, file_path: str) -> pd.DataFrame:
+        """
+        Load a parsed DataFrame through the process-wide dataset cache
+        
+        The cache key is the stored file path (which embeds the file_id) and the
+        entry is versioned by mtime and size, so a replaced file is re-parsed.
+        The returned frame is shared and must not be mutated.
+        """
+        stat = os.stat(file_path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        return dataset_cache.get_or_load(str(file_path), version, lambda: self._load_uncached(file_path))
+    
+    def load_sample(self, file_path: str) -> pd.DataFrame:
+        """
+        Load the bounded row sample of a file too large to parse whole
+        
+        Cached next to parsed frames (see load_dataframe), so the file is only
+        read once per version; see streaming_profile.read_sample.
+        """
+        stat = os.stat(file_path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        return dataset_cache.get_or_load((str(file_path), "sample"), version, lambda: streaming_profile.read_sample(file_path))
+    
+    def build_columnar_sidecar(self, file_path: str) -> None:
+        """
+        Convert an uploaded file to a memory-mappable Arrow sidecar
+        
+        Meant to run as a background task right after upload. The parsed frame
+        also warms the dataset cache so the first analysis doesn't re-parse.
+        Workbooks are instead converted to one dataset per sheet, and converted
+        sheets are already columnar. CSVs large enough to be summarized chunk
+        by chunk are skipped, since conversion would parse them whole.
+        """
+        if not columnar.is_available() or columnar.is_dataset(file_path) or columnar.has_fresh_sidecar(file_path):
+            return
+        if streaming_profile.should_stream(file_path):
+            return
+        try:
+            if workbooks.is_workbook(file_path):
+                workbooks.convert_workbook(file_path)
+                return
+            df = self.load_dataframe(file_path)
+            columnar.write_sidecar(file_path, df)
+        except Exception as e:
+            print(f"Warning: Columnar conversion failed for {file_path}: {e}")
+    
+    def get_schema(self, file_path: str, df: Optional[pd.DataFrame] = None) -> Dict:
+        """
+        Get the inferred column schema for a stored file
+        
+        Inference runs once per file; the result is stored with the file so
+        later trend, chart and chat calls skip datetime detection entirely.
+        """
+        stored = artifacts.load_artifact(file_path, "schema")
+        if stored is not None:
+            return stored
+        
+        if df is None:
+            df = self.load_dataframe(file_path)
+        inferred = schema_inference.infer_schema(df)
+        artifacts.save_artifact(file_path, "schema", inferred)
+        return inferred
+    
+    def get_profile(self, file_path: str, df: Optional[pd.DataFrame] = None) -> profiling.DatasetProfile:
+        """
+        Get the column profile for a stored file
+        
+        The profile is built once per dataset and stored with the file; the
+        summary and the LLM context builders all read from it.
+        """
+        stored = artifacts.load_artifact(file_path, "profile")
+        if stored is not None:
+            return profiling.DatasetProfile.from_dict(stored)
+        
+        if df is None:
+            df = self.load_dataframe(file_path)
+        profile = profiling.build_profile(df)
+        artifacts.save_artifact(file_path, "profile", profile.to_dict())
+        return profile
+    
+    def get_correlation(self, file_path: str, method: str = "pearson", df: Optional[pd.DataFrame] = None) -> Dict:
+        """
+        Get the correlation matrix of the numeric columns for a stored file
+        
+        Pearson comes from the dataset profile, so the heatmap and the LLM
+        context builders share one matrix; other methods are computed once
+        and stored with the file.
+        
+        Returns:
+            Dict: method, columns and matrix (rows of coefficients, None if undefined)
+        """
+        if method == "pearson":
+            profile = self.get_profile(file_path, df)
+            return {
+                "method": method,
+                "columns": list(profile.correlation_columns),
+                "matrix": [list(row) for row in profile.correlation]
+            }
+        
+        kind = f"correlation.{method}"
+        stored = artifacts.load_artifact(file_path, kind)
+        if stored is not None:
+            return stored
+        
+        if df is None:
+            df = self.load_dataframe(file_path)
+        columns = self.get_schema(file_path, df)["numeric_columns"]
+        result = {
+            "method": method,
+            "columns": columns,
+            "matrix": correlation.matrix_rows(correlation.correlation_matrix(df, columns, method)) if len(columns) >= 2 else []
+        }
+        artifacts.save_artifact(file_path, kind, result)
+        return result
+    
+    def _load_uncached(self, file_path: str) -> pd.DataFrame:
+        """Prefer the columnar sidecar, falling back to parsing the original file"""
+        df = columnar.read_sidecar(file_path)
+        if df is None:
+            df = self._read_file(file_path)
+        return df
+    
+    def _read_file(self, file_path: str) -> pd.DataFrame:
+        """Read a CSV or Excel file from disk"""
+        file_extension = Path(file_path).suffix.lower()
+        
+        if file_extension == '.csv':
+            if arrow_dtypes.is_enabled():
+                return arrow_dtypes.read_csv(file_path)
+            return pd.read_csv(file_path)
+        elif columnar.is_dataset(file_path):
+            return columnar.read_dataset(file_path)
+        elif file_extension in {'.xlsx', '.xls'}:
+            if arrow_dtypes.is_enabled():
+                return arrow_dtypes.read_excel(file_path)
+            return pd.read_excel(file_path)
+        else:
+            raise ValueError(f"Unsupported file format: {file_extension}")
+    
+    def _generate_data_summary(self, df: pd.DataFrame, schema: Optional[Dict] = None,
+                               profile: Optional[profiling.DatasetProfile] = None) -> Dict:
         """Generate comprehensive data summary"""
+        if schema is None:
+            schema = schema_inference.infer_schema(df)
+        if profile is None:
+            profile = profiling.build_profile(df)
+        
         summary = {
             "rows": len(df),
             "columns": len(df.columns),
             "column_names": df.columns.tolist(),
             "data_types": df.dtypes.astype(str).to_dict(),
-            "missing_values": df.isnull().sum().to_dict(),
-            "memory_usage": df.memory_usage(deep=True).sum(),
+            "missing_values": {col: int(count) for col, count in df.isnull().sum().items()},
+            "memory_usage": int(df.memory_usage(deep=True).sum()),
             "statistics": {}
         }
         
         # Generate statistics for numeric columns
-        numeric_columns = df.select_dtypes(include=[np.number]).columns
-        if len(numeric_columns) > 0:
-            summary["statistics"]["numeric"] = {}
-            for col in numeric_columns:
-                summary["statistics"]["numeric"][col] = {
-                    "mean": float(df[col].mean()) if not df[col].isna().all() else None,
-                    "median": float(df[col].median()) if not df[col].isna().all() else None,
-                    "std": float(df[col].std()) if not df[col].isna().all() else None,
-                    "min": float(df[col].min()) if not df[col].isna().all() else None,
-                    "max": float(df[col].max()) if not df[col].isna().all() else None,
-                    "missing_count": int(df[col].isna().sum())
-                }
+        numeric_statistics = profiling.numeric_statistics(profile.numeric)
+        if numeric_statistics:
+            summary["statistics"]["numeric"] = numeric_statistics
         
         # Generate statistics for categorical columns
-        categorical_columns = df.select_dtypes(include=['object', 'category']).columns
-        if len(categorical_columns) > 0:
-            summary["statistics"]["categorical"] = {}
-            for col in categorical_columns:
-                value_counts = df[col].value_counts()
-                summary["statistics"]["categorical"][col] = {
-                    "unique_values": int(df[col].nunique()),
-                    "most_common": value_counts.index[0] if len(value_counts) > 0 else None,
-                    "most_common_count": int(value_counts.iloc[0]) if len(value_counts) > 0 else None,
-                    "missing_count": int(df[col].isna().sum())
-                }
+        categorical_statistics = profiling.categorical_statistics(profile.categorical)
+        if categorical_statistics:
+            summary["statistics"]["categorical"] = categorical_statistics
         
         # Detect potential trends in time series data
-        summary["trends"] = self._detect_trends(df)
+        summary["trends"] = self._detect_trends(df, schema)
         
         # Detect anomalies
-        summary["anomalies"] = self._detect_anomalies(df)
+        summary["anomalies"] = self._detect_anomalies(profile)
         
         return summary
     
@@ -104,87 +271,71 @@ class DataService:
         sample_df = df.head(rows)
         return sample_df.to_string(index=False)
     
-    def _detect_trends(self, df: pd.DataFrame) -> Dict:
+    def _detect_trends(self, df: pd.DataFrame, schema: Dict) -> Dict:
         """Detect trends in time series data"""
         trends = {}
         
-        # Look for date/time columns
-        date_columns = []
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                try:
-                    pd.to_datetime(df[col])
-                    date_columns.append(col)
-                except:
-                    continue
+        # Date/time columns come from the inferred schema
+        date_columns = schema.get("datetime_columns", [])
         
         if date_columns:
             trends["time_series_columns"] = date_columns
             
-            # Analyze trends for numeric columns over time
-            numeric_columns = df.select_dtypes(include=[np.number]).columns
-            for date_col in date_columns[:1]:  # Use first date column
-                try:
-                    df_temp = df.copy()
-                    df_temp[date_col] = pd.to_datetime(df_temp[date_col])
-                    df_temp = df_temp.sort_values(date_col)
-                    
-                    for num_col in numeric_columns[:3]:  # Analyze first 3 numeric columns
-                        if not df_temp[num_col].isna().all():
-                            # Calculate trend (positive/negative)
-                            x = np.arange(len(df_temp))
-                            y = df_temp[num_col].fillna(method='ffill')
-                            if len(y) > 1:
-                                slope = np.polyfit(x, y, 1)[0]
-                                trends[f"{num_col}_trend"] = "increasing" if slope > 0 else "decreasing"
-                except:
-                    continue
+            # Analyze trends for every numeric column over time in one vectorized pass
+            numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
+            date_col = date_columns[0]  # Use first date column
+            try:
+                # Convert only the column we need and sort by position instead of copying the frame
+                order = np.argsort(schema_inference.datetime_column(df, date_col).to_numpy(), kind="stable")
+                statistics = trend_engine.compute_trends(df, order, numeric_columns)
+            except (ValueError, TypeError) as e:
+                print(f"Warning: Trend estimation failed: {e}")
+                statistics = {}
+            
+            for num_col, stats in statistics.items():
+                trends[f"{num_col}_trend"] = stats["direction"]
+            if statistics:
+                trends["trend_statistics"] = statistics
         
         return trends
     
-    def _detect_anomalies(self, df: pd.DataFrame) -> Dict:
-        """Detect anomalies in numeric data"""
+    def _detect_anomalies(self, profile: profiling.DatasetProfile) -> Dict:
+        """Detect anomalies (|z-score| > 2) in numeric data"""
         anomalies = {}
         
-        numeric_columns = df.select_dtypes(include=[np.number]).columns
-        
-        for col in numeric_columns:
-            try:
-                # Remove NaN values for analysis
-                clean_data = df[col].dropna()
-                if len(clean_data) < 3:
-                    continue
-                
-                # Calculate z-scores
-                z_scores = np.abs((clean_data - clean_data.mean()) / clean_data.std())
-                anomaly_indices = z_scores > 2  # Z-score > 2 considered anomaly
-                
-                if anomaly_indices.sum() > 0:
-                    anomalies[col] = {
-                        "anomaly_count": int(anomaly_indices.sum()),
-                        "anomaly_percentage": float(anomaly_indices.sum() / len(clean_data) * 100),
-                        "anomaly_values": clean_data[anomaly_indices].tolist()[:5]  # First 5 anomalies
-                    }
-            except:
-                continue
+        for col in profile.numeric:
+            if col.anomaly_count > 0:
+                anomalies[col.name] = {
+                    "anomaly_count": col.anomaly_count,
+                    "anomaly_percentage": float(col.anomaly_count / col.count * 100),
+                    "anomaly_values": list(col.anomaly_values)  # First 5 anomalies
+                }
         
         return anomalies
     
-    def get_chart_data(self, df: pd.DataFrame, chart_type: str, column: str) -> Dict:
+    def get_chart_data(self, df: pd.DataFrame, chart_type: str, column: str,
+                       max_points: Optional[int] = None, y_column: Optional[str] = None,
+                       method: str = "pearson", correlation_data: Optional[Dict] = None,
+                       max_columns: Optional[int] = None) -> Dict:
         """
         Prepare data for chart generation
         
         Args:
             df: Pandas DataFrame
-            chart_type: Type of chart (bar, line, pie, scatter)
+            chart_type: Type of chart (bar, line, pie, scatter, heatmap)
             column: Column to visualize
+            max_points: Target point count for line charts (default LINE_CHART_MAX_POINTS)
+            y_column: y axis for scatter charts (column is the x axis)
+            method: Correlation method for heatmaps ("pearson" or "spearman")
+            correlation_data: Precomputed correlation (see get_correlation) for heatmaps
+            max_columns: Columns kept in heatmaps (default HEATMAP_MAX_COLUMNS)
             
         Returns:
             Dict: Chart configuration data
         """
         try:
             if chart_type == "bar":
-                if df[column].dtype in ['object', 'category']:
+                if not pd.api.types.is_numeric_dtype(df[column]):
                     data = df[column].value_counts().head(10).to_dict()
                 else:
                     # Create bins for numeric data
@@ -199,18 +350,22 @@ class DataService:
                 }
             
             elif chart_type == "line":
-                if len(df) > 100:
-                    # Sample data for line charts
-                    df_sample = df.sample(n=100).sort_index()
-                else:
-                    df_sample = df
+                if not pd.api.types.is_numeric_dtype(df[column]):
+                    return {"error": f"Line charts need a numeric column; '{column}' is {df[column].dtype}"}
+                
+                # Deterministic LTTB downsampling keeps peaks and the overall
+                # shape, and the same file always yields the same chart
+                values = df[column].to_numpy(dtype="float64", na_value=np.nan)
+                positions = downsample_indices(values, max_points or LINE_CHART_MAX_POINTS)
                 
                 return {
                     "type": "line",
                     "data": {
-                        "x": df_sample.index.tolist(),
-                        "y": df_sample[column].tolist()
-                    }
+                        "x": df.index[positions].tolist(),
+                        "y": values[positions].tolist()
+                    },
+                    "total_points": int(len(df)),
+                    "sampled_points": int(len(positions))
                 }
             
             elif chart_type == "pie":
@@ -224,24 +379,134 @@ class DataService:
                 }
             
             elif chart_type == "scatter":
-                # For scatter, we need two numeric columns
-                numeric_cols = df.select_dtypes(include=[np.number]).columns
-                if len(numeric_cols) >= 2:
-                    x_col = numeric_cols[0]
-                    y_col = numeric_cols[1] if numeric_cols[1] != x_col else numeric_cols[2] if len(numeric_cols) > 2 else x_col
-                    
-                    return {
-                        "type": "scatter",
-                        "data": {
-                            "x": df[x_col].tolist(),
-                            "y": df[y_col].tolist()
-                        }
+                # x is the requested column; y defaults to the next numeric column
+                if y_column is None:
+                    numeric_cols = [col for col in df.select_dtypes(include=[np.number]).columns if col != column]
+                    if not numeric_cols:
+                        return {"error": "Scatter charts need a second numeric column"}
+                    y_column = numeric_cols[0]
+                for col in (column, y_column):
+                    if not pd.api.types.is_numeric_dtype(df[col]):
+                        return {"error": f"Scatter charts need numeric columns; '{col}' is {df[col].dtype}"}
+                
+                return self._scatter_chart(df, column, y_column)
+            
+            elif chart_type == "heatmap":
+                if correlation_data is None:
+                    columns = df.select_dtypes(include=[np.number]).columns.tolist()
+                    correlation_data = {
+                        "method": method,
+                        "columns": columns,
+                        "matrix": correlation.matrix_rows(correlation.correlation_matrix(df, columns, method)) if len(columns) >= 2 else []
                     }
+                return self._heatmap_chart(correlation_data, column, max_columns)
             
             return {"error": f"Unsupported chart type: {chart_type}"}
             
         except Exception as e:
             return {"error": f"Failed to generate chart data: {str(e)}"}
 
+    def _heatmap_chart(self, correlation_data: Dict, column: str, max_columns: Optional[int] = None) -> Dict:
+        """
+        Correlation heatmap limited to the most strongly correlated columns
+        
+        Wide frames keep the max_columns columns with the strongest correlation
+        to any other column; the requested column is always kept if numeric.
+        """
+        columns = correlation_data["columns"]
+        if len(columns) < 2:
+            return {"error": "Heatmaps need at least two numeric columns"}
+        
+        matrix = correlation.matrix_from_rows(correlation_data["matrix"])
+        pinned = columns.index(column) if column in columns else None
+        keep = correlation.top_columns(matrix, max_columns or HEATMAP_MAX_COLUMNS, pinned)
+        
+        return {
+            "type": "heatmap",
+            "method": correlation_data["method"],
+            "data": {
+                "labels": [columns[i] for i in keep],
+                "values": correlation.matrix_rows(matrix[np.ix_(keep, keep)])
+            },
+            "total_columns": len(columns)
+        }
+    
+    def _scatter_chart(self, df: pd.DataFrame, x_column: str, y_column: str) -> Dict:
+        """
+        Scatter data with a bounded payload
+        
+        Up to SCATTER_MAX_POINTS rows are returned as raw points. Larger frames
+        are aggregated into a SCATTER_BINS x SCATTER_BINS histogram of counts
+        plus a stratified sample of raw points drawn across the occupied bins.
+        """
+        x = df[x_column].to_numpy(dtype="float64", na_value=np.nan)
+        y = df[y_column].to_numpy(dtype="float64", na_value=np.nan)
+        valid = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[valid], y[valid]
+        chart = {
+            "type": "scatter",
+            "x_column": x_column,
+            "y_column": y_column,
+            "total_points": int(len(x))
+        }
+        
+        if len(x) <= SCATTER_MAX_POINTS:
+            chart.update(mode="points", data={"x": x.tolist(), "y": y.tolist()})
+            return chart
+        
+        # One vectorized pass assigns every point to a grid cell
+        x_edges = np.linspace(x.min(), x.max(), SCATTER_BINS + 1)
+        y_edges = np.linspace(y.min(), y.max(), SCATTER_BINS + 1)
+        x_bins = np.clip(((x - x_edges[0]) / ((x_edges[-1] - x_edges[0]) or 1) * SCATTER_BINS).astype(int), 0, SCATTER_BINS - 1)
+        y_bins = np.clip(((y - y_edges[0]) / ((y_edges[-1] - y_edges[0]) or 1) * SCATTER_BINS).astype(int), 0, SCATTER_BINS - 1)
+        cells = x_bins * SCATTER_BINS + y_bins
+        counts = np.bincount(cells, minlength=SCATTER_BINS * SCATTER_BINS).reshape(SCATTER_BINS, SCATTER_BINS)
+        sample = stratified_sample_indices(cells, SCATTER_SAMPLE_POINTS)
+        
+        chart.update(
+            mode="binned",
+            data={"x": x[sample].tolist(), "y": y[sample].tolist()},
+            bins={
+                "x_edges": x_edges.tolist(),
+                "y_edges": y_edges.tolist(),
+                # counts[i][j]: points with x in bin i and y in bin j
+                "counts": counts.tolist()
+            }
+        )
+        return chart
+
 # Global data service instance
-data_service = DataService() 
\ No newline at end of file
+data_service = DataService()
+
+
+# Entry points for the process pool: take a file path, return compact results
+
+def parse_file_task(file_path: str) -> Dict:
+    return data_service.parse_file_sync(file_path)
+
+
+def chart_data_task(file_path: str, chart_type: str, column: str,
+                    max_points: Optional[int] = None, y_column: Optional[str] = None,
+                    method: str = "pearson", max_columns: Optional[int] = None) -> Dict:
+    # Files too large to parse whole are charted from an evenly spaced sample
+    sampled = streaming_profile.should_stream(file_path)
+    df = data_service.load_sample(file_path) if sampled else data_service.load_dataframe(file_path)
+    if chart_type == "heatmap":
+        # The heatmap covers the numeric columns; column is only pinned into
+        # it when it is one of them, so it isn't checked against the frame
+        correlation_data = None if sampled else data_service.get_correlation(file_path, method, df)
+        chart = data_service.get_chart_data(df, chart_type, column, method=method,
+                                            correlation_data=correlation_data, max_columns=max_columns)
+    else:
+        for col in (column, y_column):
+            if col is not None and col not in df.columns:
+                return {"error": f"Column '{col}' not found in dataset"}
+        chart = data_service.get_chart_data(df, chart_type, column, max_points, y_column)
+    if sampled and "error" not in chart:
+        # Bar and pie counts are then counts within the sample
+        chart["sampled_rows"] = len(df)
+    return chart
+
+
+def columnar_sidecar_task(file_path: str) -> None:
+    data_service.build_columnar_sidecar(file_path) 
\ No newline at end of file
@@ -0,0 +1,90 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+
+
+class DatasetCache:
+    """Process-wide LRU cache of parsed DataFrames bounded by a byte budget.
+
+    Entries are keyed by an identifier (e.g. file_id) plus a version (e.g. the
+    file's mtime), so a changed file on disk is never served stale. Cached
+    frames are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Hashable, pd.DataFrame, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, version: Hashable) -> Optional[pd.DataFrame]:
+        """Return the cached frame for key/version, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, version: Hashable, df: pd.DataFrame) -> None:
+        """Insert a frame, evicting least recently used entries to fit the budget"""
+        size = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            self._remove(key)
+            if size > self.max_bytes:
+                # Larger than the whole budget: serve it uncached
+                return
+            self._entries[key] = (version, df, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, version: Hashable, loader: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """Return the cached frame or call loader() and cache its result"""
+        df = self.get(key, version)
+        if df is None:
+            df = loader()
+            self.put(key, version, df)
+        return df
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry (e.g. after the file is deleted)"""
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current memory footprint"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[2]
+
+# Global dataset cache instance (512MB default budget)
+dataset_cache = DatasetCache(int(os.getenv("DATASET_CACHE_MAX_BYTES", 536870912)))
@@ -0,0 +1,147 @@
+import numpy as np
+
+# Series longer than this multiple of the target are first reduced to the
+# min/max of each bucket, which keeps every peak and spike, before LTTB runs
+MINMAX_PRESELECT_RATIO = 4
+
+# Stratified sampling keeps about this multiple of each group's quota as
+# candidates, so only a small subset of a large frame is ever sorted
+STRATIFIED_OVERSAMPLE = 3
+
+
+def minmax_indices(y: np.ndarray, buckets: int) -> np.ndarray:
+    """
+    Positions of the minimum and maximum of each of `buckets` equal-width buckets
+
+    One vectorized pass: the series is padded and reshaped to (buckets, width)
+    so both reductions are row-wise argmin/argmax.
+    """
+    n = len(y)
+    width = -(-n // buckets)  # ceil division
+    padded = np.full(width * (-(-n // width)), np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(-1, width)
+    missing = np.isnan(blocks)
+    offsets = np.arange(len(blocks)) * width
+    lows = np.where(missing, np.inf, blocks).argmin(axis=1) + offsets
+    highs = np.where(missing, -np.inf, blocks).argmax(axis=1) + offsets
+    positions = np.unique(np.concatenate([[0, n - 1], lows, highs]))
+    return positions[positions < n]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: positions of n_out points that keep the shape of y
+
+    The first and last points are always kept; every bucket in between keeps
+    the point forming the largest triangle with the previously kept point and
+    the average of the next bucket. Each bucket is one vectorized step.
+    """
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1][:n_out], dtype=int)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+
+    for i in range(n_out - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_end = max(next_end, next_start + 1)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+        areas = np.abs(
+            (x[previous] - avg_x) * (bucket_y - y[previous])
+            - (x[previous] - bucket_x) * (avg_y - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        selected[i + 1] = previous
+
+    return selected
+
+
+def downsample_indices(y: np.ndarray, n_out: int, x: np.ndarray = None) -> np.ndarray:
+    """
+    Deterministic, shape-preserving downsampling of a numeric series
+
+    Runs in O(n): long series are first reduced to per-bucket min/max points,
+    then LTTB picks the final n_out points. NaNs are skipped.
+
+    Args:
+        y: Series values
+        n_out: Target number of points
+        x: Optional x positions (defaults to 0..n-1)
+
+    Returns:
+        np.ndarray: Sorted positions into y of the points to plot
+    """
+    y = np.asarray(y, dtype="float64")
+    valid = np.flatnonzero(~np.isnan(y))
+    if len(valid) <= n_out:
+        return valid
+
+    x = np.arange(len(y), dtype="float64") if x is None else np.asarray(x, dtype="float64")
+    candidates = valid
+    if len(valid) > MINMAX_PRESELECT_RATIO * n_out:
+        candidates = valid[minmax_indices(y[valid], MINMAX_PRESELECT_RATIO * n_out // 2)]
+
+    return candidates[lttb_indices(x[candidates], y[candidates], n_out)]
+
+
+def stratified_sample_indices(groups: np.ndarray, size: int, seed: int = 0) -> np.ndarray:
+    """
+    Deterministic sample of up to `size` positions spread across groups
+
+    Points are taken round-robin across groups (one from every non-empty
+    group, then a second, ...), so sparse regions and outliers stay visible
+    next to dense clusters. Vectorized: a shuffle, a stable sort by group and
+    a sort by rank-within-group.
+
+    Args:
+        groups: Non-negative integer group id per point (e.g. a 2-D histogram bin)
+        size: Maximum number of positions to return
+        seed: Seed for the shuffle (fixed, so results are repeatable)
+
+    Returns:
+        np.ndarray: Sorted positions into groups
+    """
+    n = len(groups)
+    if n <= size:
+        return np.arange(n)
+
+    rng = np.random.default_rng(seed)
+
+    # Round-robin stops at the smallest per-group quota that reaches `size`;
+    # thin large groups to a few times that quota before sorting anything
+    group_sizes = np.bincount(groups)
+    counts = group_sizes[group_sizes > 0]
+    low, high = 1, int(counts.max())
+    while low < high:
+        mid = (low + high) // 2
+        if np.minimum(counts, mid).sum() >= size:
+            high = mid
+        else:
+            low = mid + 1
+    keep = rng.random(n) < (STRATIFIED_OVERSAMPLE * low + STRATIFIED_OVERSAMPLE) / group_sizes[groups]
+    candidates = np.flatnonzero(keep)
+    groups = groups[candidates]
+    n = len(candidates)
+
+    shuffled = rng.permutation(n)
+    order = shuffled[np.argsort(groups[shuffled], kind="stable")]
+    sorted_groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    rank = np.arange(n) - np.repeat(starts, np.diff(np.r_[starts, n]))
+
+    # Lowest ranks first; ties (same rank, different groups) in random order
+    picked = order[np.lexsort((rng.random(n), rank))[:size]]
+    return np.sort(candidates[picked])
@@ -0,0 +1,190 @@
+import asyncio
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from services.dataset_cache import dataset_cache
+
+# How often a waiting task checks whether its client went away (seconds)
+DISCONNECT_POLL_INTERVAL = 0.5
+
+# How long /health waits for each worker to report its cache stats (seconds)
+STATS_TIMEOUT = 1.0
+
+
+class TaskExecutor:
+    """Bounded process pool for CPU-bound pandas work called from async routes
+
+    Parsing, profiling and context building run in worker processes so one big
+    file can't stall the event loop. Task functions must be module-level and
+    take/return small picklable values (file paths in, dicts or strings out);
+    each worker loads frames through its own dataset cache, so DataFrames are
+    never shipped between processes.
+
+    Every worker is a single-process pool, and a task is routed by its first
+    argument (the file path), so all work on one file lands in the worker that
+    already has it cached and each file is held in at most one worker's cache.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, timeout: float):
+        # max_workers=0 runs tasks on the default thread pool instead (dev/reload)
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self._pools: List[Optional[ProcessPoolExecutor]] = [None] * max_workers
+        self._slot_pending = [0] * max_workers
+
+    def _slot_for(self, args: tuple) -> int:
+        """Worker slot for a task: a stable hash of its first argument, else the least busy"""
+        if args:
+            return zlib.crc32(str(args[0]).encode()) % self.max_workers
+        return min(range(self.max_workers), key=self._slot_pending.__getitem__)
+
+    def _get_pool(self, slot: int) -> ProcessPoolExecutor:
+        if self._pools[slot] is None:
+            # spawn: forking a process that already runs threads is unsafe
+            self._pools[slot] = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.max_workers,)
+            )
+        return self._pools[slot]
+
+    async def run(self, fn: Callable, *args: Any,
+                  is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None) -> Any:
+        """
+        Run fn(*args) off the event loop and return its result
+
+        Args:
+            fn: Module-level function to execute
+            *args: Picklable arguments; the first one picks the worker
+            is_disconnected: Optional callable (e.g. Request.is_disconnected);
+                the task is cancelled once the client goes away
+
+        Raises:
+            HTTPException: 503 when the queue is full, 504 on timeout,
+                499 when the client disconnected
+        """
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Server is busy. Try again shortly.")
+
+        if self.max_workers == 0:
+            self.pending += 1
+            try:
+                future = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+                return await self._wait(future, is_disconnected)
+            finally:
+                self.pending -= 1
+
+        slot = self._slot_for(args)
+        self.pending += 1
+        self._slot_pending[slot] += 1
+        try:
+            future = asyncio.wrap_future(self._get_pool(slot).submit(fn, *args))
+            return await self._wait(future, is_disconnected)
+        except BrokenProcessPool:
+            # The worker died (e.g. OOM); start a fresh one for the next task
+            self._pools[slot] = None
+            raise
+        finally:
+            self.pending -= 1
+            self._slot_pending[slot] -= 1
+
+    async def _wait(self, future: asyncio.Future,
+                    is_disconnected: Optional[Callable[[], Awaitable[bool]]]) -> Any:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                # Queued tasks are dropped; a task already running finishes but is discarded
+                future.cancel()
+                self.timed_out += 1
+                raise HTTPException(status_code=504, detail="Processing timed out")
+
+            wait_for = min(remaining, DISCONNECT_POLL_INTERVAL) if is_disconnected else remaining
+            done, _ = await asyncio.wait({future}, timeout=wait_for)
+            if done:
+                self.completed += 1
+                return future.result()
+
+            if is_disconnected is not None and await is_disconnected():
+                future.cancel()
+                self.cancelled += 1
+                raise HTTPException(status_code=499, detail="Client disconnected")
+
+    def shutdown(self) -> None:
+        for slot, pool in enumerate(self._pools):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._pools[slot] = None
+
+    async def cache_stats(self) -> Dict:
+        """
+        Dataset cache stats summed over the running workers
+
+        Workers that are busy past STATS_TIMEOUT (or not started yet) are left
+        out; "workers_reporting" says how many were included.
+        """
+        if self.max_workers == 0:
+            return {**dataset_cache.stats(), "workers_reporting": 1}
+
+        futures = [asyncio.wrap_future(pool.submit(_worker_cache_stats))
+                   for pool in self._pools if pool is not None]
+        reports = []
+        if futures:
+            done, pending = await asyncio.wait(futures, timeout=STATS_TIMEOUT)
+            for future in pending:
+                future.cancel()
+            reports = [f.result() for f in done if f.exception() is None]
+
+        totals = {field: sum(r[field] for r in reports)
+                  for field in ("entries", "bytes", "max_bytes", "hits", "misses", "evictions")}
+        lookups = totals["hits"] + totals["misses"]
+        totals["hit_rate"] = round(totals["hits"] / lookups, 4) if lookups else 0.0
+        totals["workers_reporting"] = len(reports)
+        return totals
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.max_workers,
+            "workers_started": sum(pool is not None for pool in self._pools),
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "cancelled": self.cancelled,
+        }
+
+
+# Entry points for the process pool
+
+def _init_worker(max_workers: int) -> None:
+    # Every worker holds its own dataset cache; files are routed to a single
+    # worker, so sharing the configured budget between them keeps the pool as
+    # a whole within DATASET_CACHE_MAX_BYTES without caching anything twice
+    dataset_cache.max_bytes //= max_workers
+
+
+def _worker_cache_stats() -> Dict:
+    return dataset_cache.stats()
+
+# Global executor instance
+task_executor = TaskExecutor(
+    max_workers=int(os.getenv("EXECUTOR_MAX_WORKERS", min(4, os.cpu_count() or 1))),
+    max_pending=int(os.getenv("EXECUTOR_MAX_PENDING", 32)),
+    timeout=float(os.getenv("EXECUTOR_TASK_TIMEOUT", 120)),
+)
@@ -0,0 +1,178 @@
+import asyncio
+import itertools
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from services.analysis_service import analysis_service
+from services.analysis_store import analysis_store
+
+# Queue order for each priority; lower runs first
+PRIORITY_ORDER = {"high": 0, "normal": 1, "low": 2}
+
+
+class JobQueue:
+    """Queue of analysis jobs run by a fixed number of async workers
+
+    Submitting returns a job id immediately; workers take jobs in priority
+    order (FIFO within a priority) and record the pipeline stage as it runs.
+    Each process runs the jobs submitted to it, but every status change is
+    written to the analysis store's SQLite database, so any worker process
+    can report a job and finished jobs survive restarts. Job records only
+    keep the analysis_id and are dropped retention seconds after they finish.
+    """
+
+    def __init__(self, workers: int, max_queued: int, retention: float):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.retention = retention
+        # Queued and running jobs of this process
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._sequence = itertools.count()
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        """Start the workers on the running event loop (idempotent)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.PriorityQueue()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers; queued jobs are marked failed"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+        for job in list(self._jobs.values()):
+            self._finish(job, "failed", error="Server shut down before the job finished")
+
+    def submit(self, file_id: str, priority: str = "normal", use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Queue an analysis of file_id
+
+        Returns:
+            Dict: The new job record
+
+        Raises:
+            HTTPException: 503 when the queue is full
+        """
+        self.start()
+        self._prune()
+        if self._queue.qsize() >= self.max_queued:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Too many queued jobs. Try again shortly.")
+
+        job = {
+            "job_id": str(uuid.uuid4()),
+            "file_id": file_id,
+            "priority": priority,
+            "use_cache": use_cache,
+            "status": "queued",
+            "stage": "queued",
+            "analysis_id": None,
+            "error": None,
+            "created_at": datetime.utcnow().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        order = (PRIORITY_ORDER[priority], next(self._sequence))
+        job["_order"] = order
+        analysis_store.save_job(job)
+        self._jobs[job["job_id"]] = job
+        self._queue.put_nowait((*order, job["job_id"]))
+        return self.get(job["job_id"])
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Current job record, or None if unknown or expired"""
+        self._prune()
+        record = analysis_store.get_job(job_id)
+        if record is None:
+            return None
+        job = self._jobs.get(job_id)
+        if job is not None and job["status"] == "queued":
+            # Only known for jobs queued in this process
+            record["queue_position"] = self._queue_position(job)
+        return record
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None:
+                self._queue.task_done()
+                continue
+            self._update(job, status="running", started_at=datetime.utcnow().isoformat())
+            try:
+                analysis = await analysis_service.analyze(
+                    job["file_id"],
+                    use_cache=job["use_cache"],
+                    on_stage=lambda stage: self._update(job, stage=stage)
+                )
+                job["analysis_id"] = analysis["analysis_id"]
+                self._finish(job, "completed")
+            except asyncio.CancelledError:
+                raise
+            except HTTPException as e:
+                self._finish(job, "failed", error=str(e.detail))
+            except Exception as e:
+                self._finish(job, "failed", error=str(e))
+            finally:
+                self._queue.task_done()
+
+    def _update(self, job: Dict[str, Any], **changes: Any) -> None:
+        job.update(changes)
+        analysis_store.save_job(job)
+
+    def _finish(self, job: Dict[str, Any], status: str, error: Optional[str] = None) -> None:
+        self._update(
+            job,
+            status=status,
+            stage="done" if status == "completed" else "failed",
+            error=error,
+            finished_at=datetime.utcnow().isoformat()
+        )
+        self._jobs.pop(job["job_id"], None)
+        if status == "completed":
+            self.completed += 1
+        else:
+            self.failed += 1
+
+    def _queue_position(self, job: Dict[str, Any]) -> int:
+        """Number of queued jobs that will start before this one"""
+        return sum(
+            1 for other in self._jobs.values()
+            if other["status"] == "queued" and other["_order"] < job["_order"]
+        )
+
+    def _prune(self) -> None:
+        analysis_store.prune_jobs((datetime.utcnow() - timedelta(seconds=self.retention)).isoformat())
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": sum(1 for job in self._jobs.values() if job["status"] == "running"),
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+# Global job queue instance
+job_queue = JobQueue(
+    workers=int(os.getenv("JOB_WORKERS", 2)),
+    max_queued=int(os.getenv("JOB_MAX_QUEUED", 100)),
+    retention=float(os.getenv("JOB_RETENTION_SECONDS", 3600)),
+)
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+def fingerprint(model: str, messages: List[Dict]) -> str:
+    """SHA-256 of the model name and the exact messages sent to it"""
+    payload = json.dumps({"model": model, "messages": messages}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Disk-backed cache of LLM completions keyed by prompt fingerprint
+
+    Completions are stored in SQLite so they survive restarts and are shared
+    by every worker process. Entries expire after ttl seconds and the least
+    recently used ones are evicted once the stored responses exceed max_bytes.
+    """
+
+    def __init__(self, db_path: Path, ttl: float, max_bytes: int):
+        self.db_path = Path(db_path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        # Opened on first use, so importing the module creates no files
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """The database connection, opened with its schema on first use (callers hold the lock)"""
+        if self._connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used)")
+            self._connection = conn
+        return self._connection
+
+    def get(self, model: str, messages: List[Dict]) -> Optional[str]:
+        """Return the cached completion, or None on a miss or expired entry"""
+        key = fingerprint(model, messages)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, model: str, messages: List[Dict], response: str) -> None:
+        """Store a completion, evicting least recently used entries to fit the budget"""
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (fingerprint(model, messages), model, response, size, now, now)
+                )
+                self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+                self.evictions += self._evict()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self) -> int:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        evicted = 0
+        if total <= self.max_bytes:
+            return evicted
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+            if total <= self.max_bytes:
+                break
+        return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for this process and the shared on-disk footprint"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+# Global LLM response cache (24h TTL, 64MB default budget)
+llm_cache = LLMResponseCache(
+    Path(os.getenv("LLM_CACHE_PATH", os.path.join(os.getenv("UPLOAD_DIR", "./uploads"), "llm_cache.db"))),
+    ttl=float(os.getenv("LLM_CACHE_TTL", 86400)),
+    max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", 67108864)),
+)
@@ -0,0 +1,345 @@
+import warnings
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.correlation import correlation_matrix
+
+# dtypes profiled as categorical ('string' covers pandas' nullable string dtype)
+CATEGORICAL_DTYPES = ['object', 'category', 'string']
+
+# Numeric columns are profiled in 2-D blocks of at most this many cells, so
+# peak memory stays bounded on tall frames while wide frames still batch
+MAX_BLOCK_CELLS = 8_000_000
+
+# Most frequent values kept per categorical column
+TOP_K = 5
+# |z-score| above which a value counts as an anomaly
+ANOMALY_Z_SCORE = 2
+# Example values kept for anomalies / IQR outliers
+MAX_EXAMPLE_VALUES = 5
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+def _label(value: Any) -> Any:
+    # numpy scalars -> Python scalars so profiles stay JSON-serializable
+    return value.item() if hasattr(value, "item") else value
+
+
+@dataclass(frozen=True)
+class ColumnProfile:
+    """Statistics for one column, computed once per dataset"""
+    name: str
+    kind: str  # "numeric" or "categorical"
+    count: int
+    missing_count: int
+    # Numeric columns
+    sum: Optional[float] = None
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    q1: Optional[float] = None
+    median: Optional[float] = None
+    q3: Optional[float] = None
+    argmin: Any = None  # index label of the minimum
+    argmax: Any = None  # index label of the maximum
+    outlier_count: int = 0  # 1.5 x IQR rule
+    outlier_values: Tuple[float, ...] = ()
+    anomaly_count: int = 0  # |z| > ANOMALY_Z_SCORE
+    anomaly_values: Tuple[float, ...] = ()
+    # Categorical columns
+    unique_values: Optional[int] = None
+    top_values: Tuple[Tuple[Any, int], ...] = ()
+    least_common: Optional[Tuple[Any, int]] = None
+
+
+@dataclass(frozen=True)
+class DatasetProfile:
+    """Immutable, serializable profile of a dataset
+
+    Built once per dataset and shared by the data summary and the LLM prompt
+    builders, so no caller needs to rescan the frame for statistics.
+    """
+    rows: int
+    columns: Tuple[ColumnProfile, ...]
+    correlation_columns: Tuple[str, ...] = ()
+    correlation: Tuple[Tuple[Optional[float], ...], ...] = ()
+
+    def column(self, name: str) -> ColumnProfile:
+        for col in self.columns:
+            if col.name == name:
+                return col
+        raise KeyError(name)
+
+    @property
+    def numeric(self) -> List[ColumnProfile]:
+        return [col for col in self.columns if col.kind == "numeric"]
+
+    @property
+    def categorical(self) -> List[ColumnProfile]:
+        return [col for col in self.columns if col.kind == "categorical"]
+
+    @property
+    def grand_total(self) -> float:
+        """Sum of every numeric column"""
+        return float(sum(col.sum or 0.0 for col in self.numeric))
+
+    def correlation_matrix(self) -> np.ndarray:
+        """Pearson correlation matrix of the numeric columns (correlation_columns order)"""
+        size = len(self.correlation_columns)
+        return np.array(self.correlation, dtype="float64").reshape(size, size)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "DatasetProfile":
+        known = {f.name for f in fields(ColumnProfile)}
+        columns = []
+        for col in data["columns"]:
+            values = {key: value for key, value in col.items() if key in known}
+            values["outlier_values"] = tuple(values.get("outlier_values") or ())
+            values["anomaly_values"] = tuple(values.get("anomaly_values") or ())
+            values["top_values"] = tuple(tuple(item) for item in values.get("top_values") or ())
+            if values.get("least_common") is not None:
+                values["least_common"] = tuple(values["least_common"])
+            columns.append(ColumnProfile(**values))
+        return cls(
+            rows=data["rows"],
+            columns=tuple(columns),
+            correlation_columns=tuple(data.get("correlation_columns") or ()),
+            correlation=tuple(tuple(row) for row in data.get("correlation") or ()),
+        )
+
+
+def _sorted_quantiles(ordered: np.ndarray, qs: List[float]) -> np.ndarray:
+    # numpy's default (linear) quantiles, read off already sorted values
+    positions = np.asarray(qs) * (len(ordered) - 1)
+    below = np.floor(positions).astype("int64")
+    above = np.minimum(below + 1, len(ordered) - 1)
+    return ordered[below] + (ordered[above] - ordered[below]) * (positions - below)
+
+
+def _count_outside(ordered: np.ndarray, low: float, high: float) -> int:
+    # Values < low or > high in sorted values
+    return int(np.searchsorted(ordered, low, side="left") + len(ordered) - np.searchsorted(ordered, high, side="right"))
+
+
+def _first_values(values: np.ndarray, mask: np.ndarray) -> Tuple[float, ...]:
+    return tuple(float(v) for v in values[np.flatnonzero(mask)[:MAX_EXAMPLE_VALUES]])
+
+
+def _profile_numeric_columns(df: pd.DataFrame, columns: List[str]) -> List[ColumnProfile]:
+    """
+    Profile numeric columns in batched 2-D passes
+
+    Columns are stacked into float64 blocks and the moments are axis-0
+    reductions over the block, instead of one pandas call (and scan) per
+    column per statistic. Quantiles, extremes and outlier/anomaly counts are
+    read off one sorted copy per column; row masks are only built for columns
+    that have example values to report.
+    """
+    if not columns:
+        return []
+    if len(df) == 0:
+        # Nothing to reduce: numpy rejects min/max/argmin over an empty axis
+        return [ColumnProfile(name=col, kind="numeric", count=0, missing_count=0) for col in columns]
+
+    block_width = max(1, MAX_BLOCK_CELLS // len(df))
+    profiles = []
+
+    for start in range(0, len(columns), block_width):
+        block_columns = columns[start:start + block_width]
+        block = df[block_columns].to_numpy(dtype="float64", na_value=np.nan)
+        missing = np.isnan(block)
+        counts = len(block) - missing.sum(axis=0)
+
+        with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+            # All-NaN columns legitimately produce NaN results here
+            warnings.simplefilter("ignore", RuntimeWarning)
+            deviations = np.where(missing, 0.0, block)
+            sums = deviations.sum(axis=0)
+            means = sums / counts
+            # Deviations from the mean, in place; missing cells stay 0
+            deviations -= means
+            deviations[missing] = 0.0
+            stds = np.sqrt(np.einsum("ij,ij->j", deviations, deviations) / (counts - 1))
+            del deviations
+
+        for i, col in enumerate(block_columns):
+            values = block[:, i]
+            if counts[i] == 0:
+                profiles.append(ColumnProfile(
+                    name=col,
+                    kind="numeric",
+                    count=0,
+                    missing_count=len(block),
+                    sum=float(sums[i]),
+                ))
+                continue
+
+            # Sorted copy of the present values: quantiles, extremes and the
+            # outlier/anomaly counts are read off it without another scan
+            ordered = values[~missing[:, i]] if counts[i] < len(block) else values.copy()
+            ordered.sort()
+            q1, median, q3 = _sorted_quantiles(ordered, [0.25, 0.5, 0.75])
+            iqr = q3 - q1
+            outlier_count = _count_outside(ordered, q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+            outlier_values = ()
+            if outlier_count:
+                # Examples are the first ones in row order, so only now build a mask
+                outlier_values = _first_values(values, (values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr))
+            anomaly_count = 0
+            anomaly_values = ()
+            if counts[i] >= 3:
+                # |z| > ANOMALY_Z_SCORE, as bounds on the raw values
+                spread = ANOMALY_Z_SCORE * stds[i]
+                low, high = means[i] - spread, means[i] + spread
+                anomaly_count = _count_outside(ordered, low, high)
+                if anomaly_count:
+                    anomaly_values = _first_values(values, (values < low) | (values > high))
+
+            profiles.append(ColumnProfile(
+                name=col,
+                kind="numeric",
+                count=int(counts[i]),
+                missing_count=int(len(block) - counts[i]),
+                sum=float(sums[i]),
+                mean=_optional(means[i]),
+                std=_optional(stds[i]),
+                min=float(ordered[0]),
+                max=float(ordered[-1]),
+                q1=_optional(q1),
+                median=_optional(median),
+                q3=_optional(q3),
+                argmin=_label(df.index[np.nanargmin(values)]),
+                argmax=_label(df.index[np.nanargmax(values)]),
+                outlier_count=outlier_count,
+                outlier_values=outlier_values,
+                anomaly_count=anomaly_count,
+                anomaly_values=anomaly_values,
+            ))
+
+    return profiles
+
+
+def _profile_categorical_columns(df: pd.DataFrame, columns: List[str]) -> List[ColumnProfile]:
+    """
+    Profile categorical columns
+
+    A single value_counts per column provides the distinct count, the top-k
+    values and the least common value.
+    """
+    profiles = []
+    for col in columns:
+        series = df[col]
+        value_counts = series.value_counts()
+        count = int(value_counts.sum())
+        profiles.append(ColumnProfile(
+            name=col,
+            kind="categorical",
+            count=count,
+            missing_count=int(len(series) - count),
+            unique_values=int(len(value_counts)),
+            top_values=tuple((_label(value), int(n)) for value, n in value_counts.head(TOP_K).items()),
+            least_common=(_label(value_counts.index[-1]), int(value_counts.iloc[-1])) if len(value_counts) > 0 else None,
+        ))
+    return profiles
+
+
+def build_profile(df: pd.DataFrame) -> DatasetProfile:
+    """
+    Profile a dataset once: moments, quantiles, top-k values, outlier counts
+    and the numeric correlation matrix
+
+    Args:
+        df: Pandas DataFrame
+
+    Returns:
+        DatasetProfile: Immutable profile shared by summary and prompt builders
+    """
+    numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    categorical_columns = df.select_dtypes(include=CATEGORICAL_DTYPES).columns.tolist()
+
+    correlation = ()
+    if len(numeric_columns) >= 2:
+        matrix = correlation_matrix(df, numeric_columns, "pearson")
+        correlation = tuple(tuple(_optional(v) for v in row) for row in matrix)
+
+    return DatasetProfile(
+        rows=len(df),
+        columns=tuple(
+            _profile_numeric_columns(df, numeric_columns)
+            + _profile_categorical_columns(df, categorical_columns)
+        ),
+        correlation_columns=tuple(numeric_columns) if correlation else (),
+        correlation=correlation,
+    )
+
+
+def profile_numeric(df: pd.DataFrame, columns: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """
+    Compute mean/median/std/min/max/missing for numeric columns in batched passes
+
+    Args:
+        df: Pandas DataFrame
+        columns: Numeric columns to profile (defaults to all numeric columns)
+
+    Returns:
+        Dict: Per-column statistics; values are None for all-missing columns
+    """
+    if columns is None:
+        columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    return numeric_statistics(_profile_numeric_columns(df, columns))
+
+
+def profile_categorical(df: pd.DataFrame, columns: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """
+    Compute unique/most-common/missing statistics for categorical columns
+
+    Args:
+        df: Pandas DataFrame
+        columns: Categorical columns to profile (defaults to object/category/string)
+
+    Returns:
+        Dict: Per-column statistics
+    """
+    if columns is None:
+        columns = df.select_dtypes(include=CATEGORICAL_DTYPES).columns.tolist()
+    return categorical_statistics(_profile_categorical_columns(df, columns))
+
+
+def numeric_statistics(columns: List[ColumnProfile]) -> Dict[str, Dict]:
+    """Summary statistics block for numeric column profiles"""
+    return {
+        col.name: {
+            "mean": col.mean,
+            "median": col.median,
+            "std": col.std,
+            "min": col.min,
+            "max": col.max,
+            "missing_count": col.missing_count
+        }
+        for col in columns
+        if col.kind == "numeric"
+    }
+
+
+def categorical_statistics(columns: List[ColumnProfile]) -> Dict[str, Dict]:
+    """Summary statistics block for categorical column profiles"""
+    return {
+        col.name: {
+            "unique_values": col.unique_values,
+            "most_common": col.top_values[0][0] if col.top_values else None,
+            "most_common_count": col.top_values[0][1] if col.top_values else None,
+            "missing_count": col.missing_count
+        }
+        for col in columns
+        if col.kind == "categorical"
+    }
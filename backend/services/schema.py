@@ -0,0 +1,71 @@
+import warnings
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Non-null values probed per column before attempting a full conversion
+DATETIME_SAMPLE_SIZE = 200
+
+# Text dtypes that may hold dates serialized as strings
+TEXT_DTYPES = ['object', 'string']
+
+
+def _to_datetime(values: pd.Series) -> pd.Series:
+    with warnings.catch_warnings():
+        # "Could not infer format" is expected for free-form text columns
+        warnings.simplefilter("ignore", UserWarning)
+        return pd.to_datetime(values, errors="coerce")
+
+
+def _sample(values: pd.Series, size: int) -> pd.Series:
+    """Evenly spaced, deterministic sample of a column"""
+    if len(values) <= size:
+        return values
+    positions = np.linspace(0, len(values) - 1, size).astype(int)
+    return values.iloc[positions]
+
+
+def _parses_as_datetime(series: pd.Series) -> bool:
+    non_null = series.dropna()
+    if non_null.empty:
+        return False
+
+    # Cheap rejection: most text columns fail on a small sample
+    if _to_datetime(_sample(non_null, DATETIME_SAMPLE_SIZE)).isna().any():
+        return False
+
+    # Confirm on the whole column only for columns that passed the sample
+    return not _to_datetime(non_null).isna().any()
+
+
+def infer_schema(df: pd.DataFrame) -> Dict[str, List[str]]:
+    """
+    Infer column roles once per dataset
+
+    Text columns are first tested on a small sample of values; only columns
+    whose sample parses as dates are converted in full to confirm.
+
+    Returns:
+        Dict: Column names grouped into numeric, datetime and categorical
+    """
+    datetime_columns = df.select_dtypes(include=['datetime', 'datetimetz']).columns.tolist()
+    for col in df.select_dtypes(include=TEXT_DTYPES).columns:
+        if _parses_as_datetime(df[col]):
+            datetime_columns.append(col)
+
+    return {
+        "numeric_columns": df.select_dtypes(include=[np.number]).columns.tolist(),
+        "datetime_columns": [col for col in df.columns if col in datetime_columns],
+        "categorical_columns": [
+            col for col in df.select_dtypes(include=TEXT_DTYPES + ['category']).columns
+            if col not in datetime_columns
+        ],
+    }
+
+
+def datetime_column(df: pd.DataFrame, column: str) -> pd.Series:
+    """Convert a single column the schema identified as datetime"""
+    if pd.api.types.is_datetime64_any_dtype(df[column]):
+        return df[column]
+    return _to_datetime(df[column])
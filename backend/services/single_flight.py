@@ -0,0 +1,87 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+DisconnectCheck = Optional[Callable[[], Awaitable[bool]]]
+
+
+class _Flight:
+    """One in-flight computation and the requests waiting on it"""
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters: List[DisconnectCheck] = []
+
+    async def all_disconnected(self) -> bool:
+        # Only give up on the computation once every waiting client is gone
+        if not self.waiters or any(check is None for check in self.waiters):
+            return False
+        for check in list(self.waiters):
+            if not await check():
+                return False
+        return True
+
+
+class SingleFlight:
+    """Coalesces identical concurrent async operations into one computation
+
+    Callers passing the same (operation, key) while a computation is running
+    wait on it and share its result or exception instead of starting their
+    own. The computation is cancelled only when all waiting clients have
+    disconnected.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Tuple[str, Hashable], _Flight] = {}
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: {"calls": 0, "executed": 0, "coalesced": 0})
+
+    async def run(self, operation: str, key: Hashable,
+                  fn: Callable[[DisconnectCheck], Awaitable[Any]],
+                  is_disconnected: DisconnectCheck = None) -> Any:
+        """
+        Run fn once per (operation, key) at a time
+
+        Args:
+            operation: Operation name, used for the counters
+            key: Identifies identical work (e.g. file_id plus content hash)
+            fn: Coroutine function receiving a combined disconnect check
+            is_disconnected: This caller's disconnect check (e.g. Request.is_disconnected)
+
+        Returns:
+            The shared result of fn
+        """
+        counters = self._counters[operation]
+        counters["calls"] += 1
+        flight_key = (operation, key)
+        flight = self._flights.get(flight_key)
+
+        if flight is None:
+            flight = _Flight()
+            flight.task = asyncio.ensure_future(fn(flight.all_disconnected))
+            flight.task.add_done_callback(lambda task: self._finished(flight_key, task))
+            self._flights[flight_key] = flight
+            counters["executed"] += 1
+        else:
+            counters["coalesced"] += 1
+
+        flight.waiters.append(is_disconnected)
+        try:
+            # shield: one caller being cancelled must not cancel the shared task
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters.remove(is_disconnected)
+
+    def _finished(self, flight_key: Tuple[str, Hashable], task: asyncio.Task) -> None:
+        self._flights.pop(flight_key, None)
+        if not task.cancelled():
+            # Mark the exception retrieved even if every waiter already left
+            task.exception()
+
+    def stats(self) -> Dict:
+        return {
+            "in_flight": len(self._flights),
+            "operations": {operation: dict(counters) for operation, counters in self._counters.items()},
+        }
+
+# Global single-flight instance
+single_flight = SingleFlight()
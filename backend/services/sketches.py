@@ -0,0 +1,162 @@
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Values kept per level of a quantile sketch; rank error shrinks as ~1/k
+QUANTILE_SKETCH_K = 2048
+# log2 of the HyperLogLog register count (2^14 registers = 16KB, ~0.8% error)
+HLL_PRECISION = 14
+# Counters kept by the frequent-items summary
+FREQUENT_ITEMS_CAPACITY = 1000
+
+
+class QuantileSketch:
+    """Mergeable KLL-style quantile sketch with a deterministic error bound
+
+    Values enter level 0 with weight 1. When a level holds more than k values
+    it is sorted and every other value moves up a level with double weight.
+    A compaction at level h shifts any rank by at most 2^h, so the sum of those
+    weights is a hard bound on the rank error of every quantile query.
+    """
+
+    def __init__(self, k: int = QUANTILE_SKETCH_K):
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.count = 0
+        self.rank_error = 0
+        self._offset = 0
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        for h, level in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self.count += other.count
+        self.rank_error += other.rank_error
+        self._compress()
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) > self.k:
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                level = np.sort(level)
+                # An odd value out stays behind; alternate which half is promoted
+                keep = level[len(level) - len(level) % 2:]
+                pairs = level[:len(level) - len(level) % 2]
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], pairs[self._offset::2]])
+                self.levels[h] = keep
+                self._offset ^= 1
+                self.rank_error += 2 ** h
+            h += 1
+
+    def _weighted(self) -> Tuple[np.ndarray, np.ndarray]:
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h, dtype="float64") for h, level in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        return values[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        """Approximate quantiles, each within rank_error ranks of the exact one"""
+        if self.count == 0:
+            return [float("nan")] * len(qs)
+        values, cumulative = self._weighted()
+        targets = np.asarray(qs, dtype="float64") * cumulative[-1]
+        positions = np.clip(np.searchsorted(cumulative, targets, side="left"), 0, len(values) - 1)
+        return [float(v) for v in values[positions]]
+
+    @property
+    def relative_rank_error(self) -> float:
+        """Worst-case rank error as a fraction of the number of values"""
+        return self.rank_error / self.count if self.count else 0.0
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    # Exact for values < 2^32: frexp's exponent is floor(log2(v)) + 1
+    return np.frexp(values.astype("float64"))[1]
+
+
+class HyperLogLog:
+    """Mergeable distinct-count estimator with fixed 2^precision byte memory"""
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype="uint8")
+
+    def update(self, values: pd.Series) -> None:
+        values = values.dropna()
+        if len(values) == 0:
+            return
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        buckets = (hashes >> np.uint64(64 - self.precision)).astype("int64")
+        rest = hashes << np.uint64(self.precision)
+        high = rest >> np.uint64(32)
+        low = rest & np.uint64(0xFFFFFFFF)
+        leading_zeros = np.where(high > 0, 32 - _bit_length(high), np.where(low > 0, 64 - _bit_length(low), 64))
+        ranks = np.minimum(leading_zeros + 1, 64 - self.precision + 1).astype("uint8")
+        np.maximum.at(self.registers, buckets, ranks)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.exp2(-self.registers.astype("float64")))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate at small cardinalities
+            raw = m * np.log(m / zeros)
+        return int(round(raw))
+
+    @property
+    def relative_error(self) -> float:
+        """Standard error of the estimate"""
+        return 1.04 / np.sqrt(len(self.registers))
+
+
+class FrequentItems:
+    """Mergeable Misra-Gries summary of the most frequent values
+
+    Keeps at most capacity counters. Reported counts are lower bounds that
+    undercount by at most `error`, which is also at most n / (capacity + 1).
+    """
+
+    def __init__(self, capacity: int = FREQUENT_ITEMS_CAPACITY):
+        self.capacity = capacity
+        self.counts: Dict[Any, int] = {}
+        self.error = 0
+
+    def update(self, values: pd.Series) -> None:
+        self.merge_counts(values.value_counts().to_dict())
+
+    def merge(self, other: "FrequentItems") -> None:
+        self.error += other.error
+        self.merge_counts(other.counts)
+
+    def merge_counts(self, incoming: Dict[Any, int]) -> None:
+        """Add exact counts of values"""
+        counts = self.counts
+        for value, n in incoming.items():
+            counts[value] = counts.get(value, 0) + int(n)
+        if len(counts) > self.capacity:
+            # Subtract the (capacity + 1)-th largest count from every counter
+            threshold = int(np.partition(np.fromiter(counts.values(), dtype="int64"), -(self.capacity + 1))[-(self.capacity + 1)])
+            self.counts = {value: n - threshold for value, n in counts.items() if n > threshold}
+            self.error += threshold
+
+    def top(self, k: int) -> List[Tuple[Any, int]]:
+        """The k values with the highest (lower-bound) counts"""
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:k]
@@ -0,0 +1,432 @@
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.profiling import ANOMALY_Z_SCORE, CATEGORICAL_DTYPES, MAX_EXAMPLE_VALUES, ColumnProfile, DatasetProfile, _label
+from services.sketches import FrequentItems, HyperLogLog, QuantileSketch
+
+# CSVs at least this many bytes, or with at least this many estimated rows, are
+# summarized chunk by chunk instead of parsed in memory (0 disables a check)
+APPROX_SUMMARY_MIN_BYTES = int(os.getenv("APPROX_SUMMARY_MIN_BYTES", 50 * 1024 * 1024))
+APPROX_SUMMARY_MIN_ROWS = int(os.getenv("APPROX_SUMMARY_MIN_ROWS", 1_000_000))
+# Rows parsed per chunk when streaming a file
+STREAMING_CHUNK_ROWS = int(os.getenv("STREAMING_CHUNK_ROWS", 100_000))
+# Distinct values counted exactly per text column before switching to sketches
+STREAMING_MAX_EXACT_CATEGORIES = int(os.getenv("STREAMING_MAX_EXACT_CATEGORIES", 100_000))
+# Rows in the evenly spaced sample that stands in for the frame in prompts and charts
+STREAMING_SAMPLE_ROWS = int(os.getenv("STREAMING_SAMPLE_ROWS", 100_000))
+# Bytes read from the start of a file to estimate its row count
+ROW_ESTIMATE_SAMPLE_BYTES = 1024 * 1024
+
+
+def estimate_rows(file_path: str) -> int:
+    """Data rows in a CSV, extrapolated from the line density of its first megabyte"""
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as f:
+        head = f.read(ROW_ESTIMATE_SAMPLE_BYTES)
+    lines = head.count(b"\n") + (1 if head and not head.endswith(b"\n") else 0)
+    if len(head) < size and lines:
+        lines = int(size * lines / len(head))
+    return max(lines - 1, 0)
+
+
+def should_stream(file_path: str) -> bool:
+    """Whether a file is large enough to be summarized chunk by chunk"""
+    if Path(file_path).suffix.lower() != ".csv":
+        return False
+    if APPROX_SUMMARY_MIN_BYTES > 0 and os.path.getsize(file_path) >= APPROX_SUMMARY_MIN_BYTES:
+        return True
+    return APPROX_SUMMARY_MIN_ROWS > 0 and estimate_rows(file_path) >= APPROX_SUMMARY_MIN_ROWS
+
+
+def iter_csv_chunks(file_path: str, dtype: Optional[Dict[str, str]] = None,
+                    usecols: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Parse a CSV lazily in chunks of STREAMING_CHUNK_ROWS rows"""
+    with pd.read_csv(file_path, chunksize=STREAMING_CHUNK_ROWS, dtype=dtype, usecols=usecols) as reader:
+        yield from reader
+
+
+def read_sample(file_path: str, max_rows: int = STREAMING_SAMPLE_ROWS) -> pd.DataFrame:
+    """
+    Evenly spaced rows from the whole CSV, read chunk by chunk
+
+    Rows keep their position in the file as index labels. At most max_rows
+    rows are returned, so memory stays bounded however large the file is.
+    """
+    step = max(1, -(-estimate_rows(file_path) // max_rows))
+    parts = []
+    seen = 0
+    for chunk in iter_csv_chunks(file_path):
+        # Rows whose position in the file is a multiple of step
+        parts.append(chunk.iloc[(-seen) % step::step])
+        seen += len(chunk)
+    sample = pd.concat(parts) if parts else pd.read_csv(file_path, nrows=0)
+    if len(sample) > max_rows:
+        # The row estimate was low: thin out evenly again
+        sample = sample.iloc[np.unique(np.linspace(0, len(sample) - 1, max_rows).astype(int))]
+    return sample
+
+
+def summary_profile(summary: Dict) -> DatasetProfile:
+    """
+    Dataset profile built from a streaming summary, for the prompt builders
+
+    Sums are mean x count; quartiles, outliers, correlations, least common
+    values and the rows holding each extreme are not computed chunk by chunk
+    and are left empty.
+    """
+    rows = summary["rows"]
+    statistics = summary.get("statistics", {})
+    numeric = statistics.get("numeric", {})
+    categorical = statistics.get("categorical", {})
+    anomalies = summary.get("anomalies", {})
+    columns = []
+    for name in summary["column_names"]:
+        if name in numeric:
+            stats = numeric[name]
+            count = rows - stats["missing_count"]
+            anomaly = anomalies.get(name, {})
+            columns.append(ColumnProfile(
+                name=name,
+                kind="numeric",
+                count=count,
+                missing_count=stats["missing_count"],
+                sum=stats["mean"] * count if count else 0.0,
+                mean=stats["mean"],
+                std=stats["std"],
+                min=stats["min"],
+                max=stats["max"],
+                median=stats["median"],
+                anomaly_count=anomaly.get("anomaly_count", 0),
+                anomaly_values=tuple(anomaly.get("anomaly_values", ())),
+            ))
+        elif name in categorical:
+            stats = categorical[name]
+            top = stats["most_common"]
+            columns.append(ColumnProfile(
+                name=name,
+                kind="categorical",
+                count=rows - stats["missing_count"],
+                missing_count=stats["missing_count"],
+                unique_values=stats["unique_values"],
+                top_values=((top, stats["most_common_count"]),) if top is not None else (),
+            ))
+    return DatasetProfile(rows=rows, columns=tuple(columns))
+
+
+def _numeric_values(series: pd.Series) -> np.ndarray:
+    return series.to_numpy(dtype="float64", na_value=np.nan)
+
+
+class NumericAggregate:
+    """
+    Mergeable partial aggregates of one numeric column
+
+    count, sum, min, max and missing add up exactly across chunks. The sum of
+    squared deviations (m2) is merged with Chan's update, which stays
+    accurate where a raw sum of squares would cancel catastrophically.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.missing = 0
+        self.sum = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sketch = QuantileSketch()
+
+    @classmethod
+    def from_values(cls, values: np.ndarray) -> "NumericAggregate":
+        aggregate = cls()
+        present = ~np.isnan(values)
+        aggregate.missing = int(len(values) - present.sum())
+        values = values[present]
+        if len(values):
+            aggregate.count = len(values)
+            aggregate.sum = float(values.sum())
+            aggregate.m2 = float(((values - aggregate.sum / aggregate.count) ** 2).sum())
+            aggregate.min = float(values.min())
+            aggregate.max = float(values.max())
+            aggregate.sketch.update(values)
+        return aggregate
+
+    def merge(self, other: "NumericAggregate") -> None:
+        if other.count:
+            if self.count:
+                delta = other.mean - self.mean
+                self.m2 += other.m2 + delta * delta * self.count * other.count / (self.count + other.count)
+            else:
+                self.m2 = other.m2
+        self.count += other.count
+        self.missing += other.missing
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    @property
+    def std(self) -> Optional[float]:
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else None
+
+    def statistics(self) -> Dict:
+        return {
+            "mean": self.mean,
+            "median": self.sketch.quantiles([0.5])[0] if self.count else None,
+            "std": self.std,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "missing_count": self.missing
+        }
+
+
+class CategoryAggregate:
+    """
+    Mergeable partial aggregates of one text column
+
+    Values are counted exactly until a column has more than
+    STREAMING_MAX_EXACT_CATEGORIES distinct values; the counts then collapse
+    into a HyperLogLog and a Misra-Gries summary so memory stays bounded.
+    """
+
+    def __init__(self):
+        self.missing = 0
+        self.counts: Optional[Dict] = {}
+        self.distinct: Optional[HyperLogLog] = None
+        self.frequent: Optional[FrequentItems] = None
+
+    @classmethod
+    def from_values(cls, series: pd.Series) -> "CategoryAggregate":
+        aggregate = cls()
+        aggregate.missing = int(series.isna().sum())
+        # sort=False keeps first-appearance order, so ties resolve as in a full parse
+        aggregate.counts = series.value_counts(sort=False).to_dict()
+        aggregate._bound()
+        return aggregate
+
+    @property
+    def exact(self) -> bool:
+        return self.counts is not None
+
+    def merge(self, other: "CategoryAggregate") -> None:
+        self.missing += other.missing
+        if self.exact and other.exact:
+            counts = self.counts
+            for value, n in other.counts.items():
+                counts[value] = counts.get(value, 0) + n
+            self._bound()
+            return
+        self._to_sketches()
+        other_distinct, other_frequent = other._sketches()
+        self.distinct.merge(other_distinct)
+        self.frequent.merge(other_frequent)
+
+    def _bound(self) -> None:
+        if len(self.counts) > STREAMING_MAX_EXACT_CATEGORIES:
+            self._to_sketches()
+
+    def _sketches(self) -> Tuple[HyperLogLog, FrequentItems]:
+        if not self.exact:
+            return self.distinct, self.frequent
+        distinct, frequent = HyperLogLog(), FrequentItems()
+        distinct.update(pd.Series(list(self.counts), dtype=object))
+        frequent.merge_counts(self.counts)
+        return distinct, frequent
+
+    def _to_sketches(self) -> None:
+        self.distinct, self.frequent = self._sketches()
+        self.counts = None
+
+    def statistics(self) -> Dict:
+        if self.exact:
+            unique_values = len(self.counts)
+            top = max(self.counts.items(), key=lambda item: item[1]) if self.counts else None
+        else:
+            unique_values = self.distinct.estimate()
+            top = next(iter(self.frequent.top(1)), None)
+        return {
+            "unique_values": unique_values,
+            "most_common": _label(top[0]) if top else None,
+            "most_common_count": int(top[1]) if top else None,
+            "missing_count": self.missing
+        }
+
+
+class ChunkSummary:
+    """Partial aggregates of one chunk; merging chunk summaries summarizes the file"""
+
+    def __init__(self):
+        self.rows = 0
+        self.chunks = 0
+        self.memory_usage = 0
+        self.missing_values: Dict[str, int] = {}
+        self.dtypes: Dict[str, np.dtype] = {}
+        self.numeric: Dict[str, NumericAggregate] = {}
+        self.categorical: Dict[str, CategoryAggregate] = {}
+        # Numeric columns of the first chunk that hold text in this one
+        self.mixed: Set[str] = set()
+
+    @classmethod
+    def from_chunk(cls, chunk: pd.DataFrame, numeric_columns: List[str],
+                   categorical_columns: List[str]) -> "ChunkSummary":
+        summary = cls()
+        summary.rows = len(chunk)
+        summary.chunks = 1
+        summary.memory_usage = int(chunk.memory_usage(deep=True, index=False).sum())
+        summary.missing_values = {col: int(count) for col, count in chunk.isnull().sum().items()}
+        summary.mixed = {col for col in numeric_columns if not pd.api.types.is_numeric_dtype(chunk[col].dtype)}
+        numeric_columns = [col for col in numeric_columns if col not in summary.mixed]
+        summary.dtypes = {col: chunk[col].dtype for col in numeric_columns}
+        summary.numeric = {col: NumericAggregate.from_values(_numeric_values(chunk[col])) for col in numeric_columns}
+        summary.categorical = {col: CategoryAggregate.from_values(chunk[col]) for col in categorical_columns}
+        return summary
+
+    def merge(self, other: "ChunkSummary") -> None:
+        self.rows += other.rows
+        self.chunks += other.chunks
+        self.memory_usage += other.memory_usage
+        self.mixed |= other.mixed
+        for col, count in other.missing_values.items():
+            self.missing_values[col] = self.missing_values.get(col, 0) + count
+        for col, dtype in other.dtypes.items():
+            # e.g. an int64 column becomes float64 once a chunk has missing values
+            self.dtypes[col] = np.result_type(self.dtypes[col], dtype) if col in self.dtypes else dtype
+        for col, aggregate in other.numeric.items():
+            self.numeric.setdefault(col, NumericAggregate()).merge(aggregate)
+        for col, aggregate in other.categorical.items():
+            self.categorical.setdefault(col, CategoryAggregate()).merge(aggregate)
+
+
+class _AnomalyAggregate:
+    """Values with |z-score| > ANOMALY_Z_SCORE, counted in a second pass"""
+
+    def __init__(self, mean: float, std: float):
+        self.mean = mean
+        self.std = std
+        self.count = 0
+        self.values: List[float] = []
+
+    def update(self, values: np.ndarray) -> None:
+        with np.errstate(invalid="ignore"):
+            anomalies = values[np.abs((values - self.mean) / self.std) > ANOMALY_Z_SCORE]
+        self.count += len(anomalies)
+        room = MAX_EXAMPLE_VALUES - len(self.values)
+        if room > 0:
+            self.values.extend(float(v) for v in anomalies[:room])
+
+
+def _detect_anomalies(file_path: str, numeric: Dict[str, NumericAggregate]) -> Dict:
+    """Exact anomaly counts and example values, matching the in-memory profile"""
+    aggregates = {
+        col: _AnomalyAggregate(aggregate.mean, aggregate.std)
+        for col, aggregate in numeric.items()
+        if aggregate.count >= 3 and aggregate.std
+    }
+    if not aggregates:
+        return {}
+    for chunk in iter_csv_chunks(file_path, usecols=list(aggregates)):
+        for col, aggregate in aggregates.items():
+            aggregate.update(_numeric_values(chunk[col]))
+    return {
+        col: {
+            "anomaly_count": aggregate.count,
+            "anomaly_percentage": float(aggregate.count / numeric[col].count * 100),
+            "anomaly_values": aggregate.values
+        }
+        for col, aggregate in aggregates.items()
+        if aggregate.count > 0
+    }
+
+
+def streaming_summary(file_path: str) -> Tuple[Dict, str]:
+    """
+    Summarize a CSV chunk by chunk with flat memory use
+
+    Every chunk is reduced to partial aggregates that are merged into the
+    running total, so only one chunk is parsed at a time. Rows, missing
+    values, mean, std, min, max, distinct counts, most common values and
+    anomalies match the in-memory summary; medians come from a quantile
+    sketch, and text columns with very many distinct values fall back to
+    sketches. Columns that are numeric in the first chunk but hold text
+    further on are summarized as text columns, as a full parse would type
+    them. Approximated values and their error bounds are listed under
+    "approximation". Trends need the whole frame and are not computed.
+
+    Args:
+        file_path: Path to a CSV file
+
+    Returns:
+        Tuple[Dict, str]: Data summary (same shape as the in-memory summary) and sample data
+    """
+    first = pd.read_csv(file_path, nrows=STREAMING_CHUNK_ROWS)
+    numeric_columns = first.select_dtypes(include=[np.number]).columns.tolist()
+    categorical_columns = first.select_dtypes(include=CATEGORICAL_DTYPES).columns.tolist()
+    sample_data = first.head(5).to_string(index=False)
+
+    # Text columns stay text in every chunk, as they would in a full parse
+    total = ChunkSummary()
+    for chunk in iter_csv_chunks(file_path, dtype={col: "str" for col in categorical_columns}):
+        total.merge(ChunkSummary.from_chunk(chunk, numeric_columns, categorical_columns))
+
+    data_types = first.dtypes.astype(str).to_dict()
+    data_types.update({col: str(dtype) for col, dtype in total.dtypes.items()})
+
+    if total.mixed:
+        # A full parse reads a column with text in any row as text throughout:
+        # summarize those columns again, as text columns
+        mixed = [col for col in numeric_columns if col in total.mixed]
+        recount = ChunkSummary()
+        for chunk in iter_csv_chunks(file_path, dtype={col: "str" for col in mixed}, usecols=mixed):
+            recount.merge(ChunkSummary.from_chunk(chunk, [], mixed))
+        for col in mixed:
+            total.numeric.pop(col, None)
+            total.dtypes.pop(col, None)
+            total.categorical[col] = recount.categorical[col]
+            data_types[col] = "str"
+        # Keep the in-memory summary's column order
+        total.categorical = {col: total.categorical[col] for col in first.columns if col in total.categorical}
+
+    summary = {
+        "rows": total.rows,
+        "columns": len(first.columns),
+        "column_names": first.columns.tolist(),
+        "data_types": data_types,
+        "missing_values": {col: total.missing_values.get(col, 0) for col in first.columns},
+        "memory_usage": total.memory_usage,
+        "statistics": {},
+        "trends": {},
+        "anomalies": _detect_anomalies(file_path, total.numeric),
+        "approximate": True,
+    }
+    if total.numeric:
+        summary["statistics"]["numeric"] = {col: aggregate.statistics() for col, aggregate in total.numeric.items()}
+    if total.categorical:
+        summary["statistics"]["categorical"] = {col: aggregate.statistics() for col, aggregate in total.categorical.items()}
+
+    sketched = {col: aggregate for col, aggregate in total.categorical.items() if not aggregate.exact}
+    error_bounds = {
+        # Fraction of rows by which a reported median may be misranked
+        "median_rank_error": {col: aggregate.sketch.relative_rank_error for col, aggregate in total.numeric.items()},
+    }
+    if sketched:
+        # Standard error of unique_values relative to the true count, and the
+        # most rows by which most_common_count may undercount
+        error_bounds["unique_values_relative_error"] = {col: float(a.distinct.relative_error) for col, a in sketched.items()}
+        error_bounds["most_common_count_max_undercount"] = {col: a.frequent.error for col, a in sketched.items()}
+
+    summary["approximation"] = {
+        "method": "chunked",
+        "chunks": total.chunks,
+        "chunk_rows": STREAMING_CHUNK_ROWS,
+        "approximated": ["median"] + [f"{col}.{stat}" for col in sketched for stat in ("unique_values", "most_common")],
+        "not_computed": ["trends"],
+        "error_bounds": error_bounds,
+    }
+    return summary, sample_data
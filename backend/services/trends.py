@@ -0,0 +1,84 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from services.profiling import MAX_BLOCK_CELLS
+
+
+def _masked_regression(x: np.ndarray, y: np.ndarray, valid: np.ndarray):
+    """
+    Column-wise least squares of y on x, ignoring invalid cells
+
+    Uses closed-form sums over mean-centred values (numerically stable for
+    long series); every step is one vectorized reduction over the block.
+
+    Returns:
+        (slope, r) arrays with one value per column
+    """
+    counts = valid.sum(axis=0)
+    x = np.where(valid, x, 0.0)
+    y = np.where(valid, y, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dx = np.where(valid, x - x.sum(axis=0) / counts, 0.0)
+        dy = np.where(valid, y - y.sum(axis=0) / counts, 0.0)
+        sxx = (dx * dx).sum(axis=0)
+        syy = (dy * dy).sum(axis=0)
+        sxy = (dx * dy).sum(axis=0)
+        slope = sxy / sxx
+        r = sxy / np.sqrt(sxx * syy)
+    return slope, r
+
+
+def compute_trends(df: pd.DataFrame, order: np.ndarray, columns: List[str], rank_statistic: bool = True) -> Dict[str, Dict]:
+    """
+    Estimate linear trends for many numeric columns at once
+
+    Each column is regressed on its position in time order. Missing values are
+    skipped per column. Cost is linear in rows x columns.
+
+    Args:
+        df: Pandas DataFrame
+        order: Row positions sorting df by its time column
+        columns: Numeric columns to analyze
+        rank_statistic: Also compute Spearman's rho against time, a rank-based
+            measure of monotonic trend that is robust to outliers
+
+    Returns:
+        Dict: Per-column slope, R², direction and (optionally) spearman_rho
+    """
+    if not columns:
+        return {}
+
+    rows = max(len(df), 1)
+    block_width = max(1, MAX_BLOCK_CELLS // rows)
+    positions = np.arange(len(df), dtype="float64")[:, None]
+    results = {}
+
+    for start in range(0, len(columns), block_width):
+        block_columns = columns[start:start + block_width]
+        block = df[block_columns].to_numpy(dtype="float64", na_value=np.nan)[order]
+        valid = ~np.isnan(block)
+
+        slope, r = _masked_regression(positions, block, valid)
+
+        rho = None
+        if rank_statistic:
+            # Ranks of time among each column's valid rows are a running count
+            time_ranks = np.cumsum(valid, axis=0).astype("float64")
+            value_ranks = pd.DataFrame(block).rank().to_numpy()
+            _, rho = _masked_regression(time_ranks, value_ranks, valid)
+
+        counts = valid.sum(axis=0)
+        for i, col in enumerate(block_columns):
+            if counts[i] < 2 or np.isnan(slope[i]):
+                continue
+            results[col] = {
+                "direction": "increasing" if slope[i] > 0 else "decreasing",
+                "slope": float(slope[i]),
+                "r_squared": float(r[i] ** 2) if not np.isnan(r[i]) else 0.0,
+            }
+            if rho is not None:
+                results[col]["spearman_rho"] = float(rho[i]) if not np.isnan(rho[i]) else 0.0
+
+    return results
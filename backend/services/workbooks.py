@@ -0,0 +1,141 @@
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from services import arrow_dtypes, artifacts, columnar
+
+try:
+    import python_calamine  # noqa: F401  (Rust reader, several times faster than openpyxl)
+    EXCEL_ENGINE = "calamine"
+except ImportError:  # fall back to pandas' default read-only reader (openpyxl / xlrd)
+    EXCEL_ENGINE = None
+
+WORKBOOK_SUFFIXES = {".xlsx", ".xls"}
+SHEETS_DIR = ".sheets"
+
+
+def is_workbook(file_path: str) -> bool:
+    """Whether file_path is an Excel workbook"""
+    return Path(file_path).suffix.lower() in WORKBOOK_SUFFIXES
+
+
+def sheets_dir(file_path: str) -> Path:
+    """Directory holding the converted sheets of a stored workbook"""
+    source = Path(file_path)
+    return source.parent / SHEETS_DIR / source.name
+
+
+def load_sheets(file_path: str) -> Optional[List[Dict]]:
+    """
+    Converted sheets of a workbook
+
+    Returns:
+        List of {name, index, path, rows, columns}, or None if the workbook
+        has not been converted (or changed since)
+    """
+    sheets = artifacts.load_artifact(file_path, "sheets")
+    if sheets is None or not all(Path(sheet["path"]).exists() for sheet in sheets):
+        return None
+    return sheets
+
+
+def conversion_error(file_path: str) -> Optional[str]:
+    """Why the workbook could not be read, if conversion already failed for this version"""
+    return artifacts.load_artifact(file_path, "sheets_error")
+
+
+def convert_workbook(file_path: str) -> List[Dict]:
+    """
+    Convert every sheet of a workbook to its own memory-mappable Arrow dataset
+
+    The workbook is parsed once; afterwards every parse, chart and chat call
+    reads a sheet dataset instead. A no-op when already converted. A workbook
+    that can't be read is remembered, so it is only ever parsed once.
+
+    Args:
+        file_path: Path to a stored .xlsx/.xls file
+
+    Returns:
+        List[Dict]: The converted sheets (see load_sheets)
+
+    Raises:
+        ValueError: If the workbook could not be read before
+    """
+    sheets = load_sheets(file_path)
+    if sheets is not None:
+        return sheets
+    error = conversion_error(file_path)
+    if error is not None:
+        raise ValueError(error)
+
+    options = {"sheet_name": None}
+    if EXCEL_ENGINE:
+        options["engine"] = EXCEL_ENGINE
+    try:
+        frames = pd.read_excel(file_path, **options)
+    except Exception as e:
+        artifacts.save_artifact(file_path, "sheets_error", str(e))
+        raise
+
+    target = sheets_dir(file_path)
+    target.mkdir(parents=True, exist_ok=True)
+    sheets = []
+    for index, (name, df) in enumerate(frames.items()):
+        if arrow_dtypes.is_enabled():
+            # Sheets are read back with Arrow types (see columnar.read_dataset);
+            # categoricals are stored as Arrow dictionaries
+            df = arrow_dtypes.dictionary_encode(df)
+        path = columnar.write_dataset(target / f"{index}{columnar.SIDECAR_SUFFIX}", df)
+        sheets.append({
+            "name": str(name),
+            "index": index,
+            "path": str(path),
+            "rows": len(df),
+            "columns": len(df.columns)
+        })
+    artifacts.save_artifact(file_path, "sheets", sheets)
+    return sheets
+
+
+def find_sheet(sheets: List[Dict], sheet: Optional[str] = None) -> Optional[Dict]:
+    """
+    Look up a sheet by name, falling back to its position
+
+    Args:
+        sheets: Converted sheets (see load_sheets)
+        sheet: Sheet name or 0-based index; None selects the first sheet
+
+    Returns:
+        The matching sheet, or None
+    """
+    if not sheets:
+        return None
+    if sheet is None:
+        return sheets[0]
+    for candidate in sheets:
+        if candidate["name"] == sheet:
+            return candidate
+    if sheet.isdigit() and int(sheet) < len(sheets):
+        return sheets[int(sheet)]
+    return None
+
+
+def remove_sheets(file_path: str) -> List[str]:
+    """
+    Delete the converted sheets of a workbook
+
+    Returns:
+        List[str]: Paths of the removed sheet datasets
+    """
+    target = sheets_dir(file_path)
+    paths = [str(path) for path in target.glob(f"*{columnar.SIDECAR_SUFFIX}")]
+    shutil.rmtree(target, ignore_errors=True)
+    return paths
+
+
+# Entry point for the process pool
+
+def convert_workbook_task(file_path: str) -> List[Dict]:
+    return convert_workbook(file_path)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Benchmark DataService column profiling. Run from repo root: python scripts/bench-profiling.py
+
+Compares a per-column pandas loop against the batched profiling engine on a
+wide frame (many columns) and a tall frame (many rows). Both sides compute
+the same statistics: moments, extremes and their positions, quartiles,
+outlier/anomaly counts with example values, and top-k category counts.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from services import profiling  # noqa: E402
+
+
+def legacy_profile(df):
+    """Per-column pandas loop computing the same statistics as the engine"""
+    stats = {}
+    for col in df.select_dtypes(include=[np.number]).columns:
+        series = df[col]
+        values = series.dropna()
+        stats[col] = {"count": len(values), "missing_count": int(series.isna().sum())}
+        if values.empty:
+            continue
+        mean, std = values.mean(), values.std()
+        q1, median, q3 = values.quantile([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        outliers = values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)]
+        anomalies = values[((values - mean) / std).abs() > profiling.ANOMALY_Z_SCORE] if len(values) >= 3 else values.iloc[:0]
+        stats[col].update({
+            "sum": float(values.sum()),
+            "mean": float(mean),
+            "std": float(std),
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "q1": float(q1),
+            "median": float(median),
+            "q3": float(q3),
+            "argmin": series.idxmin(),
+            "argmax": series.idxmax(),
+            "outlier_count": len(outliers),
+            "outlier_values": outliers.head(profiling.MAX_EXAMPLE_VALUES).tolist(),
+            "anomaly_count": len(anomalies),
+            "anomaly_values": anomalies.head(profiling.MAX_EXAMPLE_VALUES).tolist(),
+        })
+    for col in df.select_dtypes(include=profiling.CATEGORICAL_DTYPES).columns:
+        value_counts = df[col].value_counts()
+        stats[col] = {
+            "count": int(value_counts.sum()),
+            "missing_count": int(df[col].isna().sum()),
+            "unique_values": len(value_counts),
+            "top_values": list(value_counts.head(profiling.TOP_K).items()),
+            "least_common": (value_counts.index[-1], int(value_counts.iloc[-1])) if len(value_counts) > 0 else None,
+        }
+    return stats
+
+
+def engine_profile(df):
+    stats = profiling.profile_numeric(df)
+    stats.update(profiling.profile_categorical(df))
+    return stats
+
+
+def make_frame(rows, numeric_cols, text_cols, seed=0):
+    rng = np.random.default_rng(seed)
+    data = {f"num_{i}": rng.normal(size=rows) for i in range(numeric_cols)}
+    for i in range(text_cols):
+        data[f"cat_{i}"] = rng.choice(["alpha", "beta", "gamma", "delta"], size=rows).astype(object)
+    df = pd.DataFrame(data)
+    # Sprinkle missing values so the NaN handling is exercised
+    df.iloc[::17, 0] = np.nan
+    return df
+
+
+def timed(fn, df, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(df)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wide-rows", type=int, default=10_000)
+    parser.add_argument("--wide-cols", type=int, default=500)
+    parser.add_argument("--tall-rows", type=int, default=10_000_000)
+    parser.add_argument("--tall-cols", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cases = [
+        ("wide", args.wide_rows, args.wide_cols),
+        ("tall", args.tall_rows, args.tall_cols),
+    ]
+
+    print(f"{'case':<6} {'rows':>12} {'cols':>6} {'legacy (s)':>12} {'engine (s)':>12} {'speedup':>8}")
+    for name, rows, cols in cases:
+        df = make_frame(rows, numeric_cols=cols, text_cols=max(1, cols // 10))
+        legacy = timed(legacy_profile, df, args.repeat)
+        engine = timed(engine_profile, df, args.repeat)
+        print(f"{name:<6} {rows:>12,} {len(df.columns):>6} {legacy:>12.3f} {engine:>12.3f} {legacy / engine:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()